@@ -0,0 +1,165 @@
+"""
+Design artifact downloads for PKL Backend
+Serves files from a design's storage folder with HTTP Range support
+(resumable downloads), strong ETags, and zero-copy transfer when a
+fronting nginx can do it
+"""
+
+import asyncio
+import os
+import re
+from typing import Optional, Tuple
+
+import aiofiles
+from starlette.datastructures import Headers, QueryParams
+from starlette.responses import Response
+
+from app.config import settings
+from app.services import layout
+from app.services.storage import content_hash
+from app.static_files import IMMUTABLE, etag_matches
+
+CHUNK_SIZE = 64 * 1024
+
+SAFE_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]{0,127}$")
+
+MEDIA_TYPES = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".svg": "image/svg+xml",
+    ".pdf": "application/pdf",
+    ".txt": "text/plain; charset=utf-8",
+    ".json": "application/json"
+}
+
+
+def artifact_path(design_id: str, filename: str) -> Optional[str]:
+    """Map a design id and file name to its sharded path, or None if unsafe"""
+    if not SAFE_NAME.match(design_id) or not SAFE_NAME.match(filename):
+        return None
+    return layout.design_file(design_id, filename)
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single "bytes=" range into inclusive (start, end).
+    Returns None when the header should be ignored (malformed or multiple
+    ranges, answered with the full file) and raises ValueError when the
+    range cannot be satisfied.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+
+    start_text, sep, end_text = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        start = int(start_text) if start_text.strip() else None
+        end = int(end_text) if end_text.strip() else None
+    except ValueError:
+        return None
+
+    if start is None:
+        # Suffix range: the last N bytes
+        if end is None:
+            return None
+        if end == 0:
+            raise ValueError("empty suffix range")
+        start, end = max(0, size - end), size - 1
+    elif end is None:
+        end = size - 1
+
+    if start > end:
+        return None
+    if start >= size:
+        raise ValueError("range starts past end of file")
+    return start, min(end, size - 1)
+
+
+class ArtifactResponse(Response):
+    """
+    File response honouring Range, If-Range and If-None-Match.
+
+    When ARTIFACT_ACCEL_REDIRECT is set the body is handed to nginx via
+    X-Accel-Redirect, which serves it with sendfile and its own range
+    handling; otherwise 64 KiB chunks are streamed with aiofiles.
+    """
+
+    def __init__(self, path: str, media_type: Optional[str] = None, filename: Optional[str] = None):
+        super().__init__(
+            media_type=media_type or MEDIA_TYPES.get(os.path.splitext(path)[1].lower(), "application/octet-stream")
+        )
+        self.path = path
+        self.filename = filename or os.path.basename(path)
+
+    async def __call__(self, scope, receive, send):
+        request_headers = Headers(scope=scope)
+        loop = asyncio.get_event_loop()
+        size, version = await loop.run_in_executor(None, lambda: (os.path.getsize(self.path), content_hash(self.path)))
+        etag = f'"{version}"'
+        versioned = QueryParams(scope["query_string"]).get("v") == version
+
+        headers = {
+            "accept-ranges": "bytes",
+            "etag": etag,
+            "cache-control": IMMUTABLE if versioned else f"public, max-age={settings.STATIC_MAX_AGE}",
+            "content-type": self.media_type,
+            "content-disposition": f'inline; filename="{self.filename}"'
+        }
+
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, etag):
+            await self._send_head(send, 304, {k: v for k, v in headers.items() if k in ("etag", "cache-control")})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        if settings.ARTIFACT_ACCEL_REDIRECT:
+            relative = os.path.relpath(self.path, "storage").replace(os.sep, "/")
+            headers["x-accel-redirect"] = settings.ARTIFACT_ACCEL_REDIRECT.rstrip("/") + "/" + relative
+            await self._send_head(send, 200, headers)
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        status, start, length = 200, 0, size
+        range_header = request_headers.get("range")
+        if_range = request_headers.get("if-range")
+        if range_header and (if_range is None or if_range.strip() == etag):
+            try:
+                byte_range = parse_range(range_header, size)
+            except ValueError:
+                await self._send_head(send, 416, {"content-range": f"bytes */{size}", "accept-ranges": "bytes"})
+                await send({"type": "http.response.body", "body": b""})
+                return
+            if byte_range:
+                start, end = byte_range
+                status, length = 206, end - start + 1
+                headers["content-range"] = f"bytes {start}-{end}/{size}"
+
+        headers["content-length"] = str(length)
+        await self._send_head(send, status, headers)
+
+        if scope["method"] == "HEAD":
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async with aiofiles.open(self.path, "rb") as f:
+            await f.seek(start)
+            remaining = length
+            while remaining > 0:
+                chunk = await f.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0 or length == 0:
+                # Empty file, or it shrank underneath us; close the response
+                await send({"type": "http.response.body", "body": b""})
+
+    async def _send_head(self, send, status: int, headers: dict):
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(name.encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()]
+        })
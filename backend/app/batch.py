@@ -0,0 +1,160 @@
+"""
+Batch generation for PKL Backend
+Co-operatives submit a whole catalog (JSON or CSV) in one request; items
+run through the generation pipeline with bounded concurrency, identical
+items share concepts and advice, and results stream back as NDJSON lines
+in the order they finish
+"""
+
+import asyncio
+import csv
+import io
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Tuple
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+NDJSON = "application/x-ndjson"
+
+# Catalog fields and the defaults /generate uses for them
+PRODUCT_DEFAULTS = {
+    "productName": "",
+    "tagline": "",
+    "preferredColors": [],
+    "salesPlatform": "local-market",
+    "desiredEmotion": "trust",
+    "productStory": "",
+    "language": "en"
+}
+
+# Option fields compared case-insensitively (spreadsheets capitalize freely)
+OPTION_FIELDS = ("salesPlatform", "desiredEmotion", "language")
+
+
+class CatalogError(ValueError):
+    """The submitted catalog cannot be read"""
+
+
+def parse_colors(value: Any) -> List[str]:
+    """A list, a JSON list, or a ';'/'|'/','-separated string (spreadsheet cells)"""
+    if isinstance(value, list):
+        return [str(color).strip() for color in value if str(color).strip()]
+    if not isinstance(value, str) or not value.strip():
+        return []
+    value = value.strip()
+    if value.startswith("["):
+        try:
+            return parse_colors(orjson.loads(value))
+        except orjson.JSONDecodeError:
+            pass
+    for separator in (";", "|", ","):
+        if separator in value:
+            return [color.strip() for color in value.split(separator) if color.strip()]
+    return [value]
+
+
+def normalize_product(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill defaults and coerce a catalog row to the shape /generate builds"""
+    if not isinstance(raw, dict):
+        raise CatalogError("Each product must be an object")
+    product = {}
+    for field, default in PRODUCT_DEFAULTS.items():
+        value = raw.get(field)
+        if field == "preferredColors":
+            product[field] = parse_colors(value)
+        elif value is None or (isinstance(value, str) and not value.strip()):
+            product[field] = default
+        else:
+            product[field] = str(value).strip()
+    for field in OPTION_FIELDS:
+        product[field] = product[field].lower()
+    return product
+
+
+def parse_catalog(data: bytes, content_type: str) -> List[Dict[str, Any]]:
+    """Products from a JSON list / {"products": [...]} body or a CSV with a header row"""
+    if "csv" in content_type:
+        try:
+            text = data.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            raise CatalogError("CSV must be UTF-8 encoded")
+        rows = list(csv.DictReader(io.StringIO(text)))
+    else:
+        try:
+            body = orjson.loads(data)
+        except orjson.JSONDecodeError as e:
+            raise CatalogError(f"Invalid JSON: {e}")
+        rows = body.get("products") if isinstance(body, dict) else body
+        if not isinstance(rows, list):
+            raise CatalogError("Expected a list of products")
+    return [normalize_product(row) for row in rows]
+
+
+def product_key(product: Dict[str, Any]) -> Tuple:
+    """Items with equal keys get identical concepts and advice"""
+    return (
+        product["productName"],
+        product["tagline"],
+        tuple(color.lower() for color in product["preferredColors"]),
+        product["salesPlatform"],
+        product["desiredEmotion"],
+        product["productStory"],
+        product["language"]
+    )
+
+
+class SharedResults:
+    """
+    Per-batch memo. The first item with a key computes the value and
+    concurrent items with the same key await that same future instead
+    of repeating the call.
+    """
+
+    def __init__(self):
+        self._futures: Dict[Tuple, asyncio.Future] = {}
+        self.hits = 0
+
+    async def get(self, kind: str, key: Tuple, factory: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._futures.get((kind, key))
+        if future is None:
+            future = asyncio.ensure_future(factory())
+            self._futures[(kind, key)] = future
+        else:
+            self.hits += 1
+        # One cancelled item must not cancel the call its twins are waiting on
+        return await asyncio.shield(future)
+
+
+async def run_batch(
+    products: List[Dict[str, Any]],
+    process: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+    concurrency: int
+) -> AsyncIterator[Dict[str, Any]]:
+    """Run process() over the products, at most `concurrency` at a time, yielding results as they finish"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_one(index: int, product: Dict[str, Any]) -> Dict[str, Any]:
+        if not product["productName"]:
+            return {"index": index, "success": False, "error": "productName is required"}
+        async with semaphore:
+            try:
+                return {"index": index, "success": True, "data": await process(product)}
+            except Exception as e:
+                logger.warning("Batch item failed", extra={"index": index, "error": str(e)})
+                return {"index": index, "success": False, "error": str(e)}
+
+    tasks = [asyncio.ensure_future(run_one(index, product)) for index, product in enumerate(products)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Client went away: stop the items that have not finished
+        for task in tasks:
+            task.cancel()
+
+
+async def ndjson_lines(results: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    async for result in results:
+        yield orjson.dumps(result) + b"\n"
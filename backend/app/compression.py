@@ -0,0 +1,135 @@
+"""
+Response compression for PKL Backend
+Negotiates brotli or gzip per request for compressible bodies above a size
+threshold; large bodies are compressed off the event loop
+"""
+
+import asyncio
+import gzip
+import logging
+
+from app.config import settings
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "image/svg+xml",
+    "text/"
+)
+
+# Bodies above this are compressed in the executor instead of inline
+EXECUTOR_THRESHOLD = 64 * 1024
+
+
+def choose_encoding(accept_encoding: str) -> str:
+    """Pick "br" or "gzip" from an Accept-Encoding header, or "" for identity"""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip()] = q
+
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", accepted.get("*", 0)) > 0:
+        return "gzip"
+    return ""
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+class CompressionMiddleware:
+    """
+    Compress complete (non-streaming) responses whose content type is
+    textual and whose size reaches COMPRESSION_MIN_SIZE. Streaming bodies
+    (static files, NDJSON), partial content and pre-encoded responses pass
+    through untouched. A compressed body is a different representation, so
+    its ETag is downgraded to a weak validator.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        accept_encoding = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = choose_encoding(accept_encoding)
+        if not encoding:
+            return await self.app(scope, receive, send)
+
+        start_message = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            headers = dict(start_message.get("headers", []))
+            content_type = headers.get(b"content-type", b"").decode("latin-1")
+            body = message.get("body", b"")
+
+            if (
+                message.get("more_body", False)
+                or b"content-encoding" in headers
+                or b"content-range" in headers
+                or len(body) < settings.COMPRESSION_MIN_SIZE
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            ):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            if len(body) >= EXECUTOR_THRESHOLD:
+                loop = asyncio.get_event_loop()
+                compressed = await loop.run_in_executor(None, lambda: compress(body, encoding))
+            else:
+                compressed = compress(body, encoding)
+
+            response_headers = [
+                (name, value) for name, value in start_message.get("headers", [])
+                if name not in (b"content-length", b"vary", b"etag")
+            ]
+            etag = headers.get(b"etag")
+            if etag:
+                response_headers.append((b"etag", etag if etag.startswith(b"W/") else b"W/" + etag))
+            vary = headers.get(b"vary")
+            response_headers += [
+                (b"content-encoding", encoding.encode()),
+                (b"content-length", str(len(compressed)).encode()),
+                (b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding")
+            ]
+            await send({**start_message, "headers": response_headers})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
@@ -15,6 +15,12 @@ class Settings:
     PORT: int = 8000
     DEBUG: bool = True
     
+    # Logging Configuration
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_LEVELS: str = os.getenv("LOG_LEVELS", "")  # e.g. "app.services.replicate_generator=DEBUG"
+    LOG_DEBUG_SAMPLE_RATE: float = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0.1"))
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json")  # "json" or "text"
+    
     # CORS Configuration
     CORS_ORIGINS: List[str] = [
         "http://localhost:3000",
@@ -40,13 +46,93 @@ class Settings:
     REPLICATE_API_TOKEN: str = os.getenv("REPLICATE_API_TOKEN", "")
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     
+    # Provider endpoints (overridable to point at local stand-ins for load tests)
+    DEEPAI_API_URL: str = os.getenv("DEEPAI_API_URL", "https://api.deepai.org/api/text2img")
+    REPLICATE_API_BASE_URL: str = os.getenv("REPLICATE_API_BASE_URL", "")
+    GEMINI_API_URL: str = os.getenv("GEMINI_API_URL", "https://generativelanguage.googleapis.com/v1beta")
+    
+    # Gemini concept generation: concurrent requests share one call, answers
+    # are cached by prompt, and the rule tables answer if the budget runs out
+    GEMINI_CONCEPT_MODEL: str = os.getenv("GEMINI_CONCEPT_MODEL", "gemini-1.5-flash")
+    GEMINI_CONCEPT_BUDGET: float = float(os.getenv("GEMINI_CONCEPT_BUDGET", "4"))
+    GEMINI_CONCEPT_CACHE_TTL: int = int(os.getenv("GEMINI_CONCEPT_CACHE_TTL", str(24 * 60 * 60)))
+    GEMINI_BATCH_WINDOW: float = float(os.getenv("GEMINI_BATCH_WINDOW", "0.05"))
+    GEMINI_BATCH_MAX: int = int(os.getenv("GEMINI_BATCH_MAX", "8"))
+    
+    # Report renderer: "text" (no dependencies) or "pdf" (ReportLab)
+    REPORT_RENDERER: str = os.getenv("REPORT_RENDERER", "text")
+    
     # Cloud Storage Configuration  
     CLOUD_STORAGE_BUCKET: str = os.getenv("CLOUD_STORAGE_BUCKET", "promptagro-designs")
+    # file://storage (local disk) or s3://bucket/prefix?endpoint_url=http://minio:9000
+    OBJECT_STORE_URL: str = os.getenv("OBJECT_STORE_URL", "file://storage")
+    OBJECT_STORE_URL_EXPIRES: int = int(os.getenv("OBJECT_STORE_URL_EXPIRES", "3600"))
+    OBJECT_STORE_MULTIPART_MB: int = int(os.getenv("OBJECT_STORE_MULTIPART_MB", "8"))
+    OBJECT_STORE_CONCURRENCY: int = int(os.getenv("OBJECT_STORE_CONCURRENCY", "8"))
+    # Endpoint browsers use for presigned URLs when it differs from endpoint_url
+    OBJECT_STORE_PUBLIC_ENDPOINT: str = os.getenv("OBJECT_STORE_PUBLIC_ENDPOINT", "")
+    # Full rescan correcting the incremental storage counters
+    STORAGE_STATS_RECONCILE_INTERVAL: int = int(os.getenv("STORAGE_STATS_RECONCILE_INTERVAL", str(6 * 60 * 60)))
+    
+    # Shared State Configuration (memory:// for dev, redis://host:6379/0 for multi-worker)
+    STATE_BACKEND_URL: str = os.getenv("STATE_BACKEND_URL", "memory://")
+    DESIGN_STATE_TTL: int = int(os.getenv("DESIGN_STATE_TTL", str(7 * 24 * 60 * 60)))
+    
+    # Lifespan Configuration
+    EXECUTOR_WORKERS: int = int(os.getenv("EXECUTOR_WORKERS", "16"))
+    SHUTDOWN_DRAIN_TIMEOUT: float = float(os.getenv("SHUTDOWN_DRAIN_TIMEOUT", "25"))
+    
+    # Public URLs for generated artifacts (versioned URLs are cached for a year)
+    PUBLIC_BASE_URL: str = os.getenv("PUBLIC_BASE_URL", "https://promptagrow.onrender.com")
+    STATIC_MAX_AGE: int = int(os.getenv("STATIC_MAX_AGE", "300"))
+    # e.g. /protected-storage/ to hand artifact downloads to nginx (internal location aliased to storage/)
+    ARTIFACT_ACCEL_REDIRECT: str = os.getenv("ARTIFACT_ACCEL_REDIRECT", "")
+    
+    # Upload normalization (longest side matches the largest provider input)
+    UPLOAD_MAX_BYTES: int = int(os.getenv("UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+    UPLOAD_MAX_PIXELS: int = int(os.getenv("UPLOAD_MAX_PIXELS", "50000000"))
+    UPLOAD_MAX_SIDE: int = int(os.getenv("UPLOAD_MAX_SIDE", "1024"))
+    UPLOAD_JPEG_QUALITY: int = int(os.getenv("UPLOAD_JPEG_QUALITY", "85"))
+    IMAGE_WORKERS: int = int(os.getenv("IMAGE_WORKERS", str(os.cpu_count() or 2)))
+    
+    # Concept and advice rule tables and per-language advice templates (loaded once per process)
+    RULES_FILE: str = os.getenv("RULES_FILE", os.path.join(os.path.dirname(__file__), "data", "rules.json"))
+    ADVICE_TEMPLATES_DIR: str = os.getenv("ADVICE_TEMPLATES_DIR", os.path.join(os.path.dirname(__file__), "data", "advice"))
+    ADVICE_CACHE_SIZE: int = int(os.getenv("ADVICE_CACHE_SIZE", "4096"))
+    
+    # Batch generation (/api/generate/batch)
+    BATCH_MAX_ITEMS: int = int(os.getenv("BATCH_MAX_ITEMS", "200"))
+    BATCH_CONCURRENCY: int = int(os.getenv("BATCH_CONCURRENCY", "8"))
+    
+    # Storage I/O: small writes and fsyncs within one window share a batch
+    STORAGE_WRITE_BATCH_WINDOW: float = float(os.getenv("STORAGE_WRITE_BATCH_WINDOW", "0.005"))
+    STORAGE_FSYNC: bool = os.getenv("STORAGE_FSYNC", "true").lower() == "true"
+    STORAGE_HEALTH_TTL: float = float(os.getenv("STORAGE_HEALTH_TTL", "10"))
+    STORAGE_MIN_FREE_MB: int = int(os.getenv("STORAGE_MIN_FREE_MB", "200"))
+    
+    # Storage Garbage Collection (unsaved designs past retention are deleted)
+    GC_ENABLED: bool = os.getenv("GC_ENABLED", "true").lower() == "true"
+    GC_INTERVAL: int = int(os.getenv("GC_INTERVAL", str(60 * 60)))
+    GC_RETENTION_DAYS: float = float(os.getenv("GC_RETENTION_DAYS", "30"))
+    GC_BATCH_SIZE: int = int(os.getenv("GC_BATCH_SIZE", "50"))
+    GC_BATCH_PAUSE: float = float(os.getenv("GC_BATCH_PAUSE", "0.5"))
+    
+    # Response Compression (brotli when accepted and installed, else gzip)
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    COMPRESSION_GZIP_LEVEL: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    COMPRESSION_BROTLI_QUALITY: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
     
     # Database Configuration (if needed)
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./promptagro.db")
     
+    # Request profiling (X-Profile: <ADMIN_TOKEN> header, or sampled)
+    PROFILE_SAMPLE_RATE: float = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    PROFILE_INTERVAL: float = float(os.getenv("PROFILE_INTERVAL", "0.001"))
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", "storage/profiles")
+    PROFILE_KEEP: int = int(os.getenv("PROFILE_KEEP", "50"))
+    
     # Security
+    ADMIN_TOKEN: str = os.getenv("ADMIN_TOKEN", "")
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here")
 
 # Create settings instance
@@ -0,0 +1,130 @@
+"""
+Service container for PKL Backend
+Creates shared clients and pools once at startup and closes them on shutdown
+"""
+
+import logging
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceContainer:
+    def __init__(self):
+        self.pkl_ai = None
+        self.storage = None
+        self.generator = None
+        self.state = None
+        self.http = None
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.image_executor: Optional[ThreadPoolExecutor] = None
+        self.background: list = []
+
+        self.in_flight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self.started = False
+
+    async def startup(self):
+        """Build services, shared pools and clients, then warm them"""
+        import requests
+        from app.services.promptagro_ai import PKLAI
+        from app.services.storage import StorageService
+        from app.services.providers import get_provider
+        from app.services.state import create_state_backend
+
+        # Every run_in_executor(None, ...) in the services lands on this pool
+        self.executor = ThreadPoolExecutor(
+            max_workers=settings.EXECUTOR_WORKERS,
+            thread_name_prefix="pkl-io"
+        )
+        asyncio.get_running_loop().set_default_executor(self.executor)
+
+        # CPU-bound image work gets its own pool so it can't starve file and
+        # network I/O; Pillow releases the GIL while decoding and resampling
+        self.image_executor = ThreadPoolExecutor(
+            max_workers=settings.IMAGE_WORKERS,
+            thread_name_prefix="pkl-image"
+        )
+
+        # One pooled HTTP session for provider calls and image downloads
+        self.http = requests.Session()
+
+        self.state = create_state_backend(settings.STATE_BACKEND_URL)
+        self.storage = StorageService()
+        self.pkl_ai = PKLAI(settings.GOOGLE_AI_API_KEY, http=self.http, state=self.state)
+        self.generator = get_provider("replicate")(settings.REPLICATE_API_TOKEN)
+
+        # Warm connections and the executor so the first request doesn't pay for them
+        await self.state.check_health()
+        await self.storage.check_health()
+
+        self.background.append(asyncio.create_task(self._reconcile_storage_stats()))
+        if settings.GC_ENABLED:
+            self.background.append(asyncio.create_task(self._collect_garbage()))
+
+        self.started = True
+
+    async def shutdown(self):
+        """Drain in-flight requests, then close pools and clients"""
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=settings.SHUTDOWN_DRAIN_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning("Shutdown drain timed out", extra={"in_flight": self.in_flight})
+
+        for task in self.background:
+            task.cancel()
+        await asyncio.gather(*self.background, return_exceptions=True)
+        self.background.clear()
+
+        if self.pkl_ai:
+            await self.pkl_ai.close()
+        if self.state:
+            await self.state.close()
+        if self.storage:
+            await self.storage.close()
+        if self.http:
+            self.http.close()
+        if self.image_executor:
+            self.image_executor.shutdown(wait=True)
+        if self.executor:
+            self.executor.shutdown(wait=True)
+
+        self.started = False
+
+    async def _reconcile_storage_stats(self):
+        """Periodically recount storage so incremental counters can't drift for long"""
+        while True:
+            try:
+                # Workers share the counters; whichever is due first rescans
+                await self.storage.reconcile_stats(max_age=settings.STORAGE_STATS_RECONCILE_INTERVAL / 2)
+            except Exception as e:
+                logger.warning("Storage stats reconciliation failed", extra={"error": str(e)})
+            await asyncio.sleep(settings.STORAGE_STATS_RECONCILE_INTERVAL)
+
+    async def _collect_garbage(self):
+        """Storage GC every GC_INTERVAL; a file lock keeps it to one worker at a time"""
+        from app.services.gc import StorageGC
+
+        while True:
+            await asyncio.sleep(settings.GC_INTERVAL)
+            try:
+                await StorageGC(self.storage).run()
+            except Exception as e:
+                logger.warning("Storage GC failed", extra={"error": str(e)})
+
+    def request_started(self):
+        self.in_flight += 1
+        self._idle.clear()
+
+    def request_finished(self):
+        self.in_flight -= 1
+        if self.in_flight == 0:
+            self._idle.set()
+
+
+services = ServiceContainer()
@@ -3,15 +3,37 @@ PKL FastAPI Backend
 AI-Powered Agri-Packaging Platform
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-import uvicorn
+from fastapi.responses import ORJSONResponse
+from contextlib import asynccontextmanager
 import os
+import uuid
 from pathlib import Path
 
 from app.routes import router
 from app.config import settings
+from app.container import services
+from app.metrics import render_metrics, METRICS_CONTENT_TYPE
+from app.logging_config import setup_logging, request_id_var
+from app.compression import CompressionMiddleware
+from app.static_files import CachedStaticFiles
+from app.profiling import ProfilingMiddleware, router as admin_router
+
+# Structured, queue-backed logging for the whole "app" logger tree
+setup_logging(
+    level=settings.LOG_LEVEL,
+    module_levels=settings.LOG_LEVELS,
+    debug_sample_rate=settings.LOG_DEBUG_SAMPLE_RATE,
+    json_output=settings.LOG_FORMAT == "json"
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create and warm shared services at startup, drain and close them at shutdown"""
+    await services.startup()
+    yield
+    await services.shutdown()
 
 # Create FastAPI application
 app = FastAPI(
@@ -19,9 +41,46 @@ app = FastAPI(
     description="AI-Powered Agricultural Packaging Platform",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
+# Correlate every log line of a request, honouring an upstream X-Request-ID
+@app.middleware("http")
+async def request_context(request: Request, call_next):
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex[:12]
+    token = request_id_var.set(request_id)
+    try:
+        response = await call_next(request)
+        response.headers["X-Request-ID"] = request_id
+        return response
+    finally:
+        request_id_var.reset(token)
+
+# Opt-in per-request profiling; a header/rate check when not triggered
+app.add_middleware(ProfilingMiddleware)
+
+# Track in-flight requests so shutdown can drain them. Pure ASGI, so a
+# request counts until its last body chunk is sent (streamed batches too)
+class InFlightMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        services.request_started()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            services.request_finished()
+
+app.add_middleware(InFlightMiddleware)
+
+# Compress JSON/text responses for clients that accept br or gzip
+app.add_middleware(CompressionMiddleware)
+
 # CORS middleware configuration
 app.add_middleware(
     CORSMiddleware,
@@ -33,11 +92,12 @@ app.add_middleware(
 
 # Include API routes
 app.include_router(router, prefix="/api")
+app.include_router(admin_router, prefix="/api/admin", include_in_schema=False)
 
-# Serve static files (for generated designs)
+# Serve static files (for generated designs) with ETags and cache headers
 static_dir = Path("static")
 static_dir.mkdir(exist_ok=True)
-app.mount("/static", StaticFiles(directory="static"), name="static")
+app.mount("/static", CachedStaticFiles(directory="static"), name="static")
 
 # Root endpoint
 @app.get("/")
@@ -57,7 +117,13 @@ async def health_check():
         "version": "1.0.0"
     }
 
+# Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(content=render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(
         "main:app",
         host=settings.HOST,
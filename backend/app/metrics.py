@@ -0,0 +1,105 @@
+"""
+Latency metrics for PKL Backend
+Monotonic per-stage timing exported as Prometheus histograms
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+
+# Stages range from sub-millisecond file writes to 30s provider calls
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+
+STAGE_SECONDS = Histogram(
+    "pkl_stage_duration_seconds",
+    "Duration of one pipeline stage",
+    ["stage", "provider", "outcome"],
+    buckets=LATENCY_BUCKETS
+)
+
+REQUEST_SECONDS = Histogram(
+    "pkl_request_duration_seconds",
+    "End-to-end duration of a generation request",
+    ["endpoint", "outcome"],
+    buckets=LATENCY_BUCKETS
+)
+
+# Set from the storage counters; the latest write from any worker wins
+STORAGE_BYTES = Gauge("pkl_storage_bytes", "Bytes used under storage/", multiprocess_mode="mostrecent")
+STORAGE_ITEMS = Gauge("pkl_storage_items", "Items under storage/", ["kind"], multiprocess_mode="mostrecent")
+
+GC_RECLAIMED_BYTES = Counter("pkl_gc_reclaimed_bytes", "Bytes deleted by storage garbage collection")
+
+# gemini = fresh model output, cache = earlier output for the same prompt, rules = rule-table fallback
+CONCEPT_RESULTS = Counter("pkl_concept_results", "Concept sets served, by source", ["source"])
+
+METRICS_CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+
+def publish_storage_stats(stats: Dict[str, int]):
+    STORAGE_BYTES.set(stats.get("total_bytes", 0))
+    for kind in ("uploads", "designs", "files"):
+        STORAGE_ITEMS.labels(kind=kind).set(stats.get(f"total_{kind}", 0))
+
+
+def provider_from_design_id(design_id: Optional[str]) -> str:
+    """Providers prefix their design ids (deepai_, replicate_, demo_, fallback_)"""
+    if not design_id or "_" not in design_id:
+        return "unknown"
+    return design_id.split("_", 1)[0]
+
+
+@contextmanager
+def timed_stage(stage: str, provider: str = "local", timings: Optional[Dict[str, float]] = None):
+    """
+    Time a block and record it in the stage histogram.
+    Yields a labels dict the block may update (provider, outcome);
+    exceptions are recorded with outcome="error".
+    """
+    labels = {"provider": provider, "outcome": "success"}
+    started = time.perf_counter()
+    try:
+        yield labels
+    except Exception:
+        labels["outcome"] = "error"
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        if timings is not None:
+            timings[stage] = round(elapsed, 4)
+        STAGE_SECONDS.labels(stage=stage, provider=labels["provider"], outcome=labels["outcome"]).observe(elapsed)
+
+
+class StageTimer:
+    """Times the stages of one request and its total duration"""
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.started = time.perf_counter()
+        self.timings: Dict[str, float] = {}
+
+    def stage(self, stage: str, provider: str = "local"):
+        return timed_stage(stage, provider, self.timings)
+
+    @property
+    def elapsed(self) -> float:
+        return round(time.perf_counter() - self.started, 4)
+
+    def finish(self, outcome: str = "success") -> float:
+        elapsed = self.elapsed
+        REQUEST_SECONDS.labels(endpoint=self.endpoint, outcome=outcome).observe(elapsed)
+        return elapsed
+
+
+def render_metrics() -> bytes:
+    """Prometheus exposition, aggregated across workers in multiprocess mode"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest()
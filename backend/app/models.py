@@ -3,7 +3,7 @@ Simplified Pydantic models for PKL API
 No complex dependencies
 """
 
-from pydantic import BaseModel, validator
+from pydantic import BaseModel, Field, validator
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
@@ -11,6 +11,7 @@ class HealthResponse(BaseModel):
     status: str
     timestamp: datetime
     services: Dict[str, bool]
+    storage: Optional[Dict[str, Any]] = None
 
 class GenerateResponse(BaseModel):
     success: bool
@@ -32,10 +33,11 @@ class SaveDesignRequest(BaseModel):
     designName: str
 
 class ConceptResponse(BaseModel):
-    text_concepts: List[str]
-    style_suggestions: List[str]
-    color_palette: List[str]
-    emotional_keywords: List[str]
+    text_concepts: List[str] = Field(..., min_length=1)
+    style_suggestions: List[str] = Field(..., min_length=1)
+    color_palette: List[str] = Field(..., min_length=1)
+    emotional_keywords: List[str] = Field(..., min_length=1)
+    layout_suggestions: List[str] = []
 
 class MockupData(BaseModel):
     image_path: str
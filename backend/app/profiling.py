@@ -0,0 +1,190 @@
+"""
+Per-request profiling for PKL Backend
+Opt-in wall-clock, async-aware profiles (pyinstrument) of single requests,
+stored on disk and retrievable as speedscope flamegraphs or HTML
+"""
+
+import asyncio
+import hmac
+import json
+import logging
+import os
+import random
+import re
+import time
+import uuid
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import HTMLResponse, ORJSONResponse, Response
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_ID_PATTERN = re.compile(r"^[0-9a-f]{12}$")
+
+
+def token_matches(token) -> bool:
+    """Constant-time comparison against ADMIN_TOKEN (never matches when it is unset)"""
+    if not settings.ADMIN_TOKEN:
+        return False
+    if isinstance(token, str):
+        token = token.encode()
+    return hmac.compare_digest(token, settings.ADMIN_TOKEN.encode())
+
+
+class ProfilingMiddleware:
+    """
+    Profile a request when it sends X-Profile with the admin token, or when
+    it is picked by PROFILE_SAMPLE_RATE. Untriggered requests cost one header
+    lookup and one random() call. One profile runs at a time per worker.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.active = False
+
+    def _triggered(self, scope) -> bool:
+        if scope["type"] != "http" or self.active:
+            return False
+        if not scope["path"].startswith("/api/") or scope["path"].startswith("/api/admin/"):
+            return False
+        if settings.ADMIN_TOKEN:
+            for name, value in scope["headers"]:
+                if name == b"x-profile" and token_matches(value):
+                    return True
+        return settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE
+
+    async def __call__(self, scope, receive, send):
+        if not self._triggered(scope):
+            return await self.app(scope, receive, send)
+
+        from pyinstrument import Profiler
+
+        profile_id = uuid.uuid4().hex[:12]
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", []).append((b"x-profile-id", profile_id.encode()))
+            await send(message)
+
+        # async_mode="enabled" attributes time spent awaiting (provider calls,
+        # executor hops) to the awaiting frames instead of the event loop
+        profiler = Profiler(interval=settings.PROFILE_INTERVAL, async_mode="enabled")
+        self.active = True
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profiler.stop()
+            self.active = False
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(
+                None,
+                lambda: save_profile(profile_id, profiler.last_session, scope["method"], scope["path"])
+            )
+
+
+def _profile_path(profile_id: str) -> str:
+    return os.path.join(settings.PROFILE_DIR, f"{profile_id}.pyisession")
+
+
+def save_profile(profile_id: str, session, method: str, path: str):
+    """Persist a session and keep only the newest PROFILE_KEEP profiles"""
+    try:
+        os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+        session.save(_profile_path(profile_id))
+        with open(os.path.join(settings.PROFILE_DIR, f"{profile_id}.meta"), "w") as f:
+            json.dump({
+                "method": method,
+                "path": path,
+                "durationSeconds": round(session.duration, 4),
+                "createdAt": int(time.time())
+            }, f)
+
+        sessions = sorted(
+            (entry for entry in os.scandir(settings.PROFILE_DIR) if entry.name.endswith(".pyisession")),
+            key=lambda entry: entry.stat().st_mtime
+        )
+        for entry in sessions[:-settings.PROFILE_KEEP]:
+            stale_id = entry.name.split(".")[0]
+            for suffix in (".pyisession", ".meta"):
+                stale_path = os.path.join(settings.PROFILE_DIR, stale_id + suffix)
+                if os.path.exists(stale_path):
+                    os.remove(stale_path)
+
+        logger.info("Request profiled", extra={"profile_id": profile_id, "path": path, "duration_s": round(session.duration, 4)})
+    except Exception as e:
+        logger.warning("Could not save profile", extra={"profile_id": profile_id, "error": str(e)})
+
+
+def read_profiles() -> list:
+    """Metadata of the stored profiles, newest first"""
+    profiles = []
+    if os.path.isdir(settings.PROFILE_DIR):
+        for name in os.listdir(settings.PROFILE_DIR):
+            if not name.endswith(".meta"):
+                continue
+            try:
+                with open(os.path.join(settings.PROFILE_DIR, name)) as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                # Being written, or left by an older version: skip rather than fail the listing
+                continue
+            profiles.append({"profileId": name[:-len(".meta")], **meta})
+
+    profiles.sort(key=lambda p: p["createdAt"], reverse=True)
+    return profiles
+
+
+def load_profile(profile_id: str):
+    """The stored pyinstrument session, or None"""
+    from pyinstrument.session import Session
+
+    if not os.path.exists(_profile_path(profile_id)):
+        return None
+    return Session.load(_profile_path(profile_id))
+
+
+def _require_admin(token: str):
+    if not token_matches(token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+router = APIRouter(default_response_class=ORJSONResponse)
+
+@router.get("/profiles")
+async def list_profiles(x_admin_token: str = Header("")):
+    """List stored request profiles, newest first"""
+    _require_admin(x_admin_token)
+
+    loop = asyncio.get_event_loop()
+    profiles = await loop.run_in_executor(None, read_profiles)
+    return {"success": True, "profiles": profiles}
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str, format: str = "speedscope", x_admin_token: str = Header("")):
+    """
+    Retrieve one profile: format=speedscope (flamegraph JSON for
+    speedscope.app) or format=html (pyinstrument's interactive view)
+    """
+    _require_admin(x_admin_token)
+
+    if not PROFILE_ID_PATTERN.match(profile_id):
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    loop = asyncio.get_event_loop()
+    session = await loop.run_in_executor(None, lambda: load_profile(profile_id))
+    if session is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "html":
+        from pyinstrument.renderers import HTMLRenderer
+        return HTMLResponse(HTMLRenderer().render(session))
+    if format == "speedscope":
+        from pyinstrument.renderers import SpeedscopeRenderer
+        return Response(
+            content=SpeedscopeRenderer().render(session),
+            media_type="application/json",
+            headers={"Content-Disposition": f'attachment; filename="{profile_id}.speedscope.json"'}
+        )
+    raise HTTPException(status_code=400, detail="format must be speedscope or html")
@@ -3,10 +3,12 @@ API Routes for PKL Backend
 Using our own AI instead of external services
 """
 
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
-from fastapi.responses import JSONResponse
-from typing import Optional
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Request
+from fastapi.responses import ORJSONResponse, RedirectResponse, StreamingResponse
+from typing import Any, Dict, Optional
+import logging
 import json
+import os
 import uuid
 import asyncio
 from datetime import datetime
@@ -17,20 +19,18 @@ from app.models import (
     SaveDesignRequest,
     HealthResponse
 )
-from app.services.promptagro_ai import PKLAI
-from app.services.storage import StorageService
-from app.services.replicate_generator import ReplicateImageGenerator
-from app.utils_simple import validate_image, create_pdf_report
+from app.artifacts import ArtifactResponse, artifact_path
+from app.batch import NDJSON, CatalogError, SharedResults, ndjson_lines, parse_catalog, product_key, run_batch
+from app.container import services
+from app.metrics import StageTimer, provider_from_design_id
+from app.services import layout
+from app.services.images import InvalidImage, normalize_upload
+from app.services.providers import get_renderer
 from app.config import settings
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
-# Initialize services with our own AI
-pkl_ai = PKLAI(settings.GOOGLE_AI_API_KEY)
-storage_service = StorageService()
-
-# Initialize Replicate service
-generator = ReplicateImageGenerator(settings.REPLICATE_API_TOKEN)
+logger = logging.getLogger(__name__)
 
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
@@ -39,11 +39,134 @@ async def health_check():
         status="healthy",
         timestamp=datetime.utcnow(),
         services={
-            "pkl_ai": await pkl_ai.check_health(),
-            "storage": await storage_service.check_health()
-        }
+            "pkl_ai": await services.pkl_ai.check_health(),
+            "storage": await services.storage.check_health(),
+            "state": await services.state.check_health()
+        },
+        storage=await services.storage.get_storage_stats()
     )
 
+async def _generate_design(
+    design_id: str,
+    image_path: Optional[str],
+    product: Dict[str, Any],
+    timer: StageTimer,
+    shared: Optional[SharedResults] = None
+) -> Dict[str, Any]:
+    """
+    Concepts, mockup, report and URLs for one product (the core of /generate).
+    Batch items pass `shared` so identical products reuse concepts and advice.
+    """
+    # Record the design so any worker can serve follow-up requests
+    await services.state.set(f"design:{design_id}", {
+        "imagePath": image_path,
+        "productName": product["productName"],
+        "tagline": product["tagline"]
+    }, ttl=settings.DESIGN_STATE_TTL)
+    
+    key = product_key(product) if shared is not None else None
+    
+    # Step 1: Generate packaging concepts with our AI
+    with timer.stage("concepts"):
+        if shared is not None:
+            concepts = await shared.get("concepts", key, lambda: services.pkl_ai.generate_packaging_concepts(product))
+        else:
+            concepts = await services.pkl_ai.generate_packaging_concepts(product)
+    
+    # Step 2: Generate mockup with our AI
+    async def make_mockup() -> Dict[str, Any]:
+        mockup = await services.pkl_ai.generate_packaging_mockup(
+            image_path=image_path or "",
+            concepts=concepts,
+            product_data={
+                "productName": product["productName"],
+                "tagline": product["tagline"],
+                "colors": product["preferredColors"],
+                "preferredColors": product["preferredColors"],
+                "desiredEmotion": product["desiredEmotion"],
+                "salesPlatform": product["salesPlatform"],
+                "productStory": product["productStory"],
+                "language": product["language"]
+            }
+        )
+        # Providers that download their image write it under storage/designs
+        await services.storage.adopt(mockup.get("image_path", ""))
+        return mockup
+    
+    with timer.stage("provider_call") as stage:
+        if shared is not None:
+            # Twin items running at the same time await one provider call
+            mockup_data = await shared.get("advice", key, make_mockup)
+        else:
+            mockup_data = await make_mockup()
+        stage["provider"] = "advisor" if mockup_data.get("advice_mode") else provider_from_design_id(mockup_data.get("design_id"))
+        if mockup_data.get("advice_mode") or mockup_data.get("has_professional_advice"):
+            stage["outcome"] = "fallback"
+    
+    # Check if we're in advice mode (when image generation isn't available)
+    if mockup_data.get("advice_mode"):
+        return {
+            "designId": design_id,
+            "adviceMode": True,
+            "professionalAdvice": mockup_data.get("professional_advice", ""),
+            "conceptSummary": mockup_data.get("concept_summary", []),
+            "nextSteps": mockup_data.get("next_steps", []),
+            "userMessage": mockup_data.get("user_message", ""),
+            "concepts": concepts["text_concepts"],
+            "stylesSuggestions": concepts["style_suggestions"],
+            "colorPalette": concepts["color_palette"],
+            "processingTime": timer.finish("advice"),
+            "stageTimings": timer.timings,
+            "aiConfidence": mockup_data.get("ai_confidence", 0.95),
+            "generator": mockup_data.get("generator", "PromptAgro Smart Advisor"),
+            "cost": mockup_data.get("cost", "FREE")
+        }
+    
+    # Step 3: Create design report (only for image mode)
+    with timer.stage("report"):
+        create_report = get_renderer(settings.REPORT_RENDERER)
+        report_path = await create_report(
+            design_id=design_id,
+            mockup_data=mockup_data,
+            concepts=concepts,
+            product_data={
+                "productName": product["productName"],
+                "tagline": product["tagline"],
+                "productStory": product["productStory"]
+            }
+        )
+        await services.storage.adopt(report_path)
+    
+    # Step 4: Generate public URLs (only for image mode)
+    with timer.stage("url_generation"):
+        mockup_url, report_url = await services.storage.get_public_urls([mockup_data["image_path"], report_path])
+    
+    # Prepare response data
+    response_data = {
+        "designId": design_id,
+        "mockupUrl": mockup_url,
+        "reportUrl": report_url,
+        "concepts": concepts["text_concepts"],
+        "stylesSuggestions": concepts["style_suggestions"],
+        "colorPalette": concepts["color_palette"],
+        "processingTime": timer.finish("success"),
+        "stageTimings": timer.timings,
+        "aiConfidence": mockup_data.get("ai_confidence", 0.85)
+    }
+    
+    # Add professional advice if available
+    if mockup_data.get("has_professional_advice"):
+        response_data.update({
+            "hasProfessionalAdvice": True,
+            "professionalAdvice": mockup_data.get("professional_advice"),
+            "conceptSummary": mockup_data.get("concept_summary"),
+            "userMessage": mockup_data.get("user_message"),
+            "generator": mockup_data.get("generator"),
+            "cost": mockup_data.get("cost")
+        })
+    
+    return response_data
+
 @router.post("/generate", response_model=GenerateResponse)
 async def generate_packaging(
     image: UploadFile = File(...),
@@ -58,11 +181,8 @@ async def generate_packaging(
     """
     Main packaging generation endpoint using our own AI
     """
+    timer = StageTimer("generate")
     try:
-        # Validate image
-        if not validate_image(image):
-            raise HTTPException(status_code=400, detail="Invalid image file")
-        
         # Parse preferred colors
         try:
             colors = json.loads(preferredColors)
@@ -72,139 +192,153 @@ async def generate_packaging(
         # Create design ID
         design_id = f"design_{uuid.uuid4().hex[:8]}"
         
-        # Save uploaded image
-        image_path = await storage_service.save_upload(image, design_id)
+        # Validate by content, strip EXIF, downsize and re-encode off the event loop
+        with timer.stage("upload_normalize"):
+            try:
+                normalized = await normalize_upload(image, services.image_executor)
+            except InvalidImage as e:
+                raise HTTPException(status_code=400, detail=f"Invalid image file: {e}")
         
-        # Step 1: Generate packaging concepts with our AI
-        concepts = await pkl_ai.generate_packaging_concepts({
-            "productName": productName,
-            "tagline": tagline,
-            "preferredColors": colors,
-            "salesPlatform": salesPlatform,
-            "desiredEmotion": desiredEmotion,
-            "productStory": productStory,
-            "language": language
-        })
+        # Save uploaded image
+        with timer.stage("upload_save"):
+            image_path = await services.storage.save_upload(normalized.data, design_id, normalized.ext)
         
-        # Step 2: Generate mockup with our AI
-        mockup_data = await pkl_ai.generate_packaging_mockup(
-            image_path=image_path,
-            concepts=concepts,
-            product_data={
+        return GenerateResponse(
+            success=True,
+            data=await _generate_design(design_id, image_path, {
                 "productName": productName,
                 "tagline": tagline,
-                "colors": colors,
                 "preferredColors": colors,
-                "desiredEmotion": desiredEmotion,
                 "salesPlatform": salesPlatform,
-                "productStory": productStory
-            }
-        )
-        
-        # Check if we're in advice mode (when image generation isn't available)
-        if mockup_data.get("advice_mode"):
-            return GenerateResponse(
-                success=True,
-                data={
-                    "designId": design_id,
-                    "adviceMode": True,
-                    "professionalAdvice": mockup_data.get("professional_advice", ""),
-                    "conceptSummary": mockup_data.get("concept_summary", []),
-                    "nextSteps": mockup_data.get("next_steps", []),
-                    "userMessage": mockup_data.get("user_message", ""),
-                    "concepts": concepts["text_concepts"],
-                    "stylesSuggestions": concepts["style_suggestions"],
-                    "colorPalette": concepts["color_palette"],
-                    "processingTime": mockup_data.get("processing_time", 0),
-                    "aiConfidence": mockup_data.get("ai_confidence", 0.95),
-                    "generator": mockup_data.get("generator", "PromptAgro Smart Advisor"),
-                    "cost": mockup_data.get("cost", "FREE")
-                }
-            )
-        
-        # Step 3: Create design report (only for image mode)
-        report_path = await create_pdf_report(
-            design_id=design_id,
-            mockup_data=mockup_data,
-            concepts=concepts,
-            product_data={
-                "productName": productName,
-                "tagline": tagline,
-                "productStory": productStory
-            }
-        )
-        
-        # Step 4: Generate public URLs (only for image mode)
-        mockup_url = await storage_service.get_public_url(mockup_data["image_path"])
-        report_url = await storage_service.get_public_url(report_path)
-        
-        # Prepare response data
-        response_data = {
-            "designId": design_id,
-            "mockupUrl": mockup_url,
-            "reportUrl": report_url,
-            "concepts": concepts["text_concepts"],
-            "stylesSuggestions": concepts["style_suggestions"],
-            "colorPalette": concepts["color_palette"],
-            "processingTime": mockup_data.get("processing_time", 0),
-            "aiConfidence": mockup_data.get("ai_confidence", 0.85)
-        }
-        
-        # Add professional advice if available
-        if mockup_data.get("has_professional_advice"):
-            response_data.update({
-                "hasProfessionalAdvice": True,
-                "professionalAdvice": mockup_data.get("professional_advice"),
-                "conceptSummary": mockup_data.get("concept_summary"),
-                "userMessage": mockup_data.get("user_message"),
-                "generator": mockup_data.get("generator"),
-                "cost": mockup_data.get("cost")
-            })
-        
-        return GenerateResponse(
-            success=True,
-            data=response_data
+                "desiredEmotion": desiredEmotion,
+                "productStory": productStory,
+                "language": language
+            }, timer)
         )
         
+    except HTTPException:
+        timer.finish("error")
+        raise
     except Exception as e:
+        timer.finish("error")
         raise HTTPException(status_code=500, detail=f"Generation failed: {str(e)}")
 
+@router.post("/generate/batch")
+async def generate_batch(request: Request):
+    """
+    Generate designs for a whole catalog: a JSON list of products (or
+    {"products": [...]}), or a CSV file with one product per row. Results
+    stream back as NDJSON, one line per item as it finishes, then a summary.
+    """
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="Expected a CSV file in the 'file' field")
+        data = await upload.read()
+        content_type = "text/csv"
+    else:
+        data = await request.body()
+    
+    try:
+        products = parse_catalog(data, content_type)
+    except CatalogError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid catalog: {e}")
+    if not products:
+        raise HTTPException(status_code=400, detail="Catalog is empty")
+    if len(products) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {settings.BATCH_MAX_ITEMS} products per batch")
+    
+    shared = SharedResults()
+    batch_timer = StageTimer("generate_batch")
+    
+    async def process(product):
+        timer = StageTimer("generate_batch_item")
+        try:
+            return await _generate_design(f"design_{uuid.uuid4().hex[:8]}", None, product, timer, shared)
+        except Exception:
+            timer.finish("error")
+            raise
+    
+    async def results():
+        succeeded = 0
+        async for result in run_batch(products, process, settings.BATCH_CONCURRENCY):
+            succeeded += result["success"]
+            yield result
+        yield {"summary": {
+            "total": len(products),
+            "succeeded": succeeded,
+            "failed": len(products) - succeeded,
+            "sharedResults": shared.hits,
+            "processingTime": batch_timer.finish("success" if succeeded else "error")
+        }}
+    
+    logger.info("Batch generation started", extra={"items": len(products), "concurrency": settings.BATCH_CONCURRENCY})
+    return StreamingResponse(ndjson_lines(results()), media_type=NDJSON)
+
 @router.post("/regenerate")
 async def regenerate_design(request: RegenerateRequest):
     """
     Design customization endpoint using our AI
     """
+    timer = StageTimer("regenerate")
     try:
-        # Validate design exists
-        design_exists = await storage_service.design_exists(request.designId)
-        if not design_exists:
+        # Look up the original upload recorded by whichever worker generated it
+        design = await services.state.get(f"design:{request.designId}") or {}
+        
+        # Validate design exists (the shared record covers designs made on other nodes)
+        if not design and not await services.storage.design_exists(request.designId):
             raise HTTPException(status_code=404, detail="Design not found")
         
+        # Records written before the sharded layout point at flat paths
+        image_path = design.get("imagePath")
+        if not image_path or not os.path.exists(image_path):
+            # Without a record the extension is unknown: uploads with transparency are kept as PNG
+            recorded_ext = os.path.splitext(image_path or "")[1]
+            candidates = [layout.upload_path(request.designId, ext) for ext in ([recorded_ext] if recorded_ext else [".jpg", ".png"])]
+            image_path = candidates[0]
+            for candidate in candidates:
+                if await services.storage.ensure_local(candidate):
+                    image_path = candidate
+                    break
+        
         # Apply customizations with our AI
-        updated_mockup = await pkl_ai.generate_packaging_mockup(
-            image_path=f"storage/uploads/{request.designId}_original.jpg",
-            concepts={
-                "text_concepts": ["Updated Design"],
-                "style_suggestions": list(request.customizations.style_preferences.values()),
-                "color_palette": request.customizations.colors or ["#2E7D32"]
-            },
-            product_data={"productName": "Updated Product"}
-        )
+        with timer.stage("provider_call") as stage:
+            updated_mockup = await services.pkl_ai.generate_packaging_mockup(
+                image_path=image_path,
+                concepts={
+                    "text_concepts": ["Updated Design"],
+                    "style_suggestions": list(request.customizations.style_preferences.values()),
+                    "color_palette": request.customizations.colors or ["#2E7D32"]
+                },
+                product_data={
+                    "productName": design.get("productName", "Updated Product"),
+                    "tagline": design.get("tagline", "")
+                }
+            )
+            stage["provider"] = "advisor" if updated_mockup.get("advice_mode") else provider_from_design_id(updated_mockup.get("design_id"))
         
         # Generate new public URL
-        mockup_url = await storage_service.get_public_url(updated_mockup["image_path"])
+        with timer.stage("url_generation"):
+            mockup_url = await services.storage.get_public_url(updated_mockup["image_path"])
         
         return {
             "success": True,
             "data": {
                 "mockupUrl": mockup_url,
                 "designId": request.designId,
-                "processingTime": updated_mockup.get("processing_time", 0),
+                "processingTime": timer.finish("success"),
+                "stageTimings": timer.timings,
                 "aiConfidence": updated_mockup.get("ai_confidence", 0.85)
             }
         }
         
+    except HTTPException:
+        timer.finish("error")
+        raise
     except Exception as e:
+        timer.finish("error")
         raise HTTPException(status_code=500, detail=f"Regeneration failed: {str(e)}")
 
 @router.post("/save-design")
@@ -224,7 +358,7 @@ async def save_design(request: SaveDesignRequest):
         }
         
         # Store in database/storage
-        await storage_service.save_design_metadata(design_data)
+        await services.storage.save_design_metadata(design_data)
         
         return {
             "success": True,
@@ -235,6 +369,20 @@ async def save_design(request: SaveDesignRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Save failed: {str(e)}")
 
+@router.api_route("/designs/{design_id}/files/{filename}", methods=["GET", "HEAD"])
+async def download_artifact(design_id: str, filename: str):
+    """Serve a design's mockup or report with Range support for resumable downloads"""
+    path = artifact_path(design_id, filename)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    if not os.path.isfile(path):
+        # Written by another node: send the client straight to the object store
+        remote_url = await services.storage.remote_url(path)
+        if remote_url is None:
+            raise HTTPException(status_code=404, detail="Artifact not found")
+        return RedirectResponse(remote_url, status_code=307)
+    return ArtifactResponse(path)
+
 @router.post("/test-upload")
 async def test_upload(image: UploadFile = File(...)):
     """Testing endpoint for file upload"""
@@ -289,6 +437,7 @@ async def generate_with_replicate(
     desiredEmotion: str = Form("trust")
 ):
     """Generate packaging using Replicate API"""
+    timer = StageTimer("generate_replicate")
     try:
         colors = json.loads(preferredColors)
         product_data = {
@@ -298,11 +447,17 @@ async def generate_with_replicate(
             "salesPlatform": salesPlatform,
             "desiredEmotion": desiredEmotion
         }
-        result = await generator.generate_packaging_image(product_data)
+        with timer.stage("provider_call") as stage:
+            result = await services.generator.generate_packaging_image(product_data)
+            stage["provider"] = provider_from_design_id(result.get("design_id"))
+            if stage["provider"] != "replicate":
+                stage["outcome"] = "fallback"
         
-        print(f"🔍 Routes result keys: {result.keys() if result else 'None'}")
-        print(f"🔍 Routes image_url: {result.get('image_url', 'NOT_FOUND')}")
-        print(f"🔍 Routes success: {result.get('success', 'NOT_FOUND')}")
+        logger.debug("Replicate route result", extra={
+            "result_keys": list(result.keys()) if result else None,
+            "image_url": str(result.get("image_url", ""))[:100],
+            "success": result.get("success")
+        })
         
         # Convert to GenerateResponse format
         return GenerateResponse(
@@ -312,8 +467,10 @@ async def generate_with_replicate(
                 "mockupUrl": result.get("image_url", ""),
                 "generator": result.get("generator", "Replicate"),
                 "cost": result.get("cost", "FREE"),
-                "promptUsed": result.get("prompt_used", "")
+                "promptUsed": result.get("prompt_used", ""),
+                "processingTime": timer.finish("success")
             }
         )
     except Exception as e:
+        timer.finish("error")
         raise HTTPException(status_code=500, detail=f"Replicate generation failed: {str(e)}")
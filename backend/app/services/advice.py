@@ -0,0 +1,171 @@
+"""
+Advice Templates for PKL
+Per-language advice wording (app/data/advice/<lang>.json) compiled once
+into literal/placeholder pieces, and an LRU of rendered advice keyed on
+the normalized inputs, so common requests cost a dict lookup
+"""
+
+import json
+import logging
+import os
+import string
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+from .rules import get_rules
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LANGUAGE = "en"
+
+# Everything a template may refer to; anything else fails at load time
+PLACEHOLDERS = {"product_name", "product_name_lower", "story", "color_scheme", "platform", "emotion"}
+
+
+class CompiledTemplate:
+    """A str.format template split once into (literal, placeholder) pieces"""
+
+    __slots__ = ("pieces",)
+
+    def __init__(self, text: str):
+        pieces = []
+        for literal, field, format_spec, conversion in string.Formatter().parse(text):
+            if field is not None and (field not in PLACEHOLDERS or format_spec or conversion):
+                raise ValueError(f"Unsupported placeholder {{{field}}} in advice template")
+            pieces.append((literal, field))
+        self.pieces: Tuple[Tuple[str, Optional[str]], ...] = tuple(pieces)
+
+    def render(self, values: Dict[str, str]) -> str:
+        return "".join(literal + values[field] if field else literal for literal, field in self.pieces)
+
+
+class AdviceTemplates:
+    """One language's wording; keys it lacks fall back to the default language"""
+
+    def __init__(self, data: Dict[str, Any], base: Optional["AdviceTemplates"] = None):
+        def section(name: str) -> Dict[str, CompiledTemplate]:
+            compiled = dict(base.sections[name]) if base else {}
+            compiled.update({key.lower(): CompiledTemplate(text) for key, text in data.get(name, {}).items()})
+            return compiled
+
+        def lines(name: str) -> List[CompiledTemplate]:
+            if name not in data and base:
+                return base.lines[name]
+            return [CompiledTemplate(text) for text in data.get(name, [])]
+
+        def single(name: str) -> CompiledTemplate:
+            if name not in data and base:
+                return base.singles[name]
+            return CompiledTemplate(data.get(name, ""))
+
+        def labels(name: str) -> Dict[str, str]:
+            merged = dict(base.labels[name]) if base else {}
+            merged.update({key.lower(): text for key, text in data.get(f"{name}_labels", {}).items()})
+            return merged
+
+        self.language = data.get("language", DEFAULT_LANGUAGE)
+        self.join = data.get("join", base.join if base else " and ")
+        self.sections = {name: section(name) for name in ("colors", "platforms", "emotions", "products")}
+        self.lines = {name: lines(name) for name in ("steps", "closing", "summary")}
+        self.singles = {name: single(name) for name in ("opening", "story")}
+        # Display names for option codes; codes without one are shown as-is
+        self.labels = {name: labels(name) for name in ("platform", "emotion")}
+
+    def label(self, name: str, code: str) -> str:
+        return self.labels[name].get(code.lower(), code)
+
+
+@lru_cache(maxsize=1)
+def available_languages() -> frozenset:
+    return frozenset(
+        name[:-len(".json")] for name in os.listdir(settings.ADVICE_TEMPLATES_DIR) if name.endswith(".json")
+    )
+
+
+def normalize_language(language: Optional[str]) -> str:
+    """'fr-FR' -> 'fr'; unknown or missing -> the default language"""
+    code = (language or DEFAULT_LANGUAGE).lower().replace("_", "-").split("-")[0]
+    return code if code in available_languages() else DEFAULT_LANGUAGE
+
+
+@lru_cache(maxsize=None)
+def get_templates(language: str) -> AdviceTemplates:
+    """Compiled templates for a normalized language code, loaded on first use"""
+    with open(os.path.join(settings.ADVICE_TEMPLATES_DIR, f"{language}.json"), "r", encoding="utf-8") as f:
+        data = json.load(f)
+    base = None if language == DEFAULT_LANGUAGE else get_templates(DEFAULT_LANGUAGE)
+    logger.info("Advice templates loaded", extra={"language": language})
+    return AdviceTemplates(data, base)
+
+
+def _parse_colors(colors: Any) -> List[str]:
+    # The advisor also receives colors as the raw JSON form field
+    if isinstance(colors, str) and colors.startswith('['):
+        try:
+            colors = json.loads(colors)
+        except ValueError:
+            colors = ["green"]
+    if isinstance(colors, list) and colors:
+        return [str(color) for color in colors[:3]]
+    return ["green"]
+
+
+def advice_key(product_data: Dict[str, Any]) -> Tuple:
+    """Normalized inputs: requests that would render the same advice share a key"""
+    story = product_data.get("productStory", "") or ""
+    return (
+        normalize_language(product_data.get("language")),
+        product_data.get("productName", "your product"),
+        product_data.get("tagline", "") or "",
+        tuple(_parse_colors(product_data.get("preferredColors", "green"))),
+        product_data.get("desiredEmotion", "trust"),
+        product_data.get("salesPlatform", "local market"),
+        # Only the opening of the story is quoted back
+        story[:50] if len(story.strip()) > 10 else ""
+    )
+
+
+@lru_cache(maxsize=settings.ADVICE_CACHE_SIZE)
+def render_advice(key: Tuple) -> str:
+    """Advice text for an advice_key() tuple"""
+    language, product_name, tagline, colors, emotion, platform, story = key
+    templates = get_templates(language)
+    values = {
+        "product_name": product_name,
+        "product_name_lower": product_name.lower(),
+        "story": story,
+        "color_scheme": templates.join.join(colors),
+        "platform": templates.label("platform", platform),
+        "emotion": templates.label("emotion", emotion)
+    }
+
+    parts = [templates.singles["opening"]]
+    for section, choice in (
+        ("colors", colors[0].lower()),
+        ("platforms", platform),
+        ("emotions", emotion),
+        ("products", get_rules().product_rule({"productName": product_name, "tagline": tagline}))
+    ):
+        template = templates.sections[section].get(choice) if choice else None
+        if template is not None:
+            parts.append(template)
+    if story:
+        parts.append(templates.singles["story"])
+    parts += templates.lines["steps"] + templates.lines["closing"]
+
+    return "\n\n".join(template.render(values) for template in parts)
+
+
+@lru_cache(maxsize=settings.ADVICE_CACHE_SIZE)
+def render_summary(language: str, product_name: str, emotion: str, platform: str) -> Tuple[str, ...]:
+    templates = get_templates(language)
+    values = {
+        "product_name": product_name,
+        "product_name_lower": product_name.lower(),
+        "story": "",
+        "color_scheme": "",
+        "platform": templates.label("platform", platform),
+        "emotion": templates.label("emotion", emotion)
+    }
+    return tuple(template.render(values) for template in templates.lines["summary"])
@@ -0,0 +1,181 @@
+"""
+Content-Addressed Blob Store for PKL
+Each distinct file is stored once as blobs/<aa>/<sha256><ext>; the paths the
+rest of the app uses (uploads, design folders) are hard links to it, so a
+blob's reference count is its link count minus one. blobs/.inodes/<inode>
+symlinks back to the blob, which lets a link find its digest without
+re-hashing it
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+from typing import Optional, Tuple
+
+from app.services.storage import file_lock
+
+logger = logging.getLogger(__name__)
+
+
+def sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BlobStore:
+    """
+    Synchronous (call it from the executor). Changes to a blob happen under
+    a lock per digest prefix (blobs/<aa>.lock), so workers can share a tree
+    without serializing on one file.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.index_dir = os.path.join(root, ".inodes")
+        os.makedirs(self.index_dir, exist_ok=True)
+
+    def blob_path(self, digest: str, ext: str = "") -> str:
+        return os.path.join(self.root, digest[:2], f"{digest}{ext}")
+
+    def _lock(self, digest: str):
+        return file_lock(os.path.join(self.root, digest[:2]))
+
+    def _index_path(self, stat_result: os.stat_result) -> str:
+        return os.path.join(self.index_dir, str(stat_result.st_ino))
+
+    def _index(self, blob: str):
+        """Record which blob owns its inode (idempotent)"""
+        index_path = self._index_path(os.stat(blob))
+        tmp_path = f"{index_path}.{os.getpid()}.tmp"
+        os.symlink(os.path.relpath(blob, self.index_dir), tmp_path)
+        os.replace(tmp_path, index_path)
+
+    def _blob_of(self, path: str, stat_result: os.stat_result) -> Optional[str]:
+        """The blob a linked path shares an inode with, or None"""
+        index_path = self._index_path(stat_result)
+        try:
+            blob = os.path.normpath(os.path.join(self.index_dir, os.readlink(index_path)))
+            if os.stat(blob).st_ino == stat_result.st_ino:
+                return blob
+        except OSError:
+            pass
+        # Linked before the index existed: hash it once and index it
+        ext = os.path.splitext(path)[1].lower()
+        blob = self.blob_path(sha256_file(path), ext)
+        try:
+            if os.stat(blob).st_ino != stat_result.st_ino:
+                return None
+            self._index(blob)
+        except OSError:
+            return None
+        return blob
+
+    def _collect(self, blob: str) -> int:
+        """Delete blob once nothing links to it; returns bytes freed. Caller holds its lock."""
+        try:
+            stat_result = os.stat(blob)
+        except FileNotFoundError:
+            return 0
+        if stat_result.st_nlink > 1:
+            return 0
+        try:
+            os.remove(self._index_path(stat_result))
+        except FileNotFoundError:
+            pass
+        os.remove(blob)
+        return stat_result.st_size
+
+    def _link(self, blob: str, dest: str):
+        """Atomically point dest at blob"""
+        tmp_path = f"{dest}.{os.getpid()}.link"
+        os.link(blob, tmp_path)
+        os.replace(tmp_path, dest)
+
+    def store(self, src_path: str, dest_path: str) -> Tuple[str, int]:
+        """
+        Move src_path's content into the store and make dest_path a link to
+        it (src_path may equal dest_path). Returns (sha256, change in bytes
+        on disk): the blob's size if it is new, minus anything dest_path
+        used to hold. Falls back to a plain file where hard links are not
+        supported.
+        """
+        stat_result = os.stat(src_path)
+        if src_path == dest_path and stat_result.st_nlink > 1:
+            # Already a link into the store
+            blob = self._blob_of(src_path, stat_result)
+            if blob:
+                return os.path.basename(os.path.splitext(blob)[0]), 0
+
+        # What dest_path holds now is released after it has been replaced
+        previous_blob, previous_size = None, 0
+        if src_path != dest_path:
+            try:
+                previous = os.stat(dest_path)
+                if previous.st_nlink > 1:
+                    previous_blob = self._blob_of(dest_path, previous)
+                else:
+                    previous_size = previous.st_size
+            except FileNotFoundError:
+                pass
+
+        digest = sha256_file(src_path)
+        ext = os.path.splitext(dest_path)[1].lower()
+        blob = self.blob_path(digest, ext)
+        size = stat_result.st_size
+
+        with self._lock(digest):
+            is_new = not os.path.exists(blob)
+            try:
+                if is_new:
+                    os.makedirs(os.path.dirname(blob), exist_ok=True)
+                    os.link(src_path, blob)
+                    self._index(blob)
+                if src_path != dest_path or not is_new:
+                    self._link(blob, dest_path)
+            except OSError as e:
+                # Cross-device or no hard-link support: keep an ordinary file
+                logger.debug("Hard link failed, storing without dedup", extra={"error": str(e)})
+                if is_new and os.path.exists(blob):
+                    os.remove(blob)
+                if src_path != dest_path:
+                    shutil.move(src_path, dest_path)
+                return digest, size - self._release_previous(previous_blob, previous_size, blob)
+
+            if src_path != dest_path:
+                os.remove(src_path)
+
+        if not is_new:
+            logger.debug("Deduplicated blob", extra={"digest": digest, "size": size})
+        return digest, (size if is_new else 0) - self._release_previous(previous_blob, previous_size, blob)
+
+    def _release_previous(self, previous_blob: Optional[str], previous_size: int, blob: str) -> int:
+        if previous_blob is None or previous_blob == blob:
+            return previous_size
+        with self._lock(os.path.basename(previous_blob)):
+            return self._collect(previous_blob)
+
+    def release(self, path: str) -> int:
+        """Delete a linked path; returns bytes freed on disk (0 while the blob is still shared)"""
+        try:
+            stat_result = os.stat(path)
+        except FileNotFoundError:
+            return 0
+        blob = self._blob_of(path, stat_result) if stat_result.st_nlink > 1 else None
+        if blob is None:
+            # Not a blob link: the path owns its bytes
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                return 0
+            return stat_result.st_size
+
+        with self._lock(os.path.basename(blob)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                return 0
+            return self._collect(blob)
@@ -0,0 +1,125 @@
+"""
+Gemini Concept Engine for PKL
+Packaging concepts from Gemini with JSON-schema-constrained output,
+validated into ConceptResponse. Concurrent prompts share one call, and
+answers are cached in the shared state store by prompt hash.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Any, Dict, List, Tuple
+
+from pydantic import ValidationError
+
+from app.config import settings
+from app.metrics import CONCEPT_RESULTS, timed_stage
+from app.models import ConceptResponse
+from .fileio import WriteBatcher
+
+logger = logging.getLogger(__name__)
+
+CONCEPT_FIELDS = ["text_concepts", "style_suggestions", "color_palette", "emotional_keywords", "layout_suggestions"]
+
+# One concept set per product, in prompt order
+BATCH_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {field: {"type": "ARRAY", "items": {"type": "STRING"}} for field in CONCEPT_FIELDS},
+        "required": CONCEPT_FIELDS
+    }
+}
+
+
+class GeminiConceptEngine:
+    def __init__(self, api_key: str, model: str, http, state=None, timeout: float = 30):
+        self.api_key = api_key
+        self.model = model
+        self.http = http
+        self.state = state
+        self.timeout = timeout
+        self.url = f"{settings.GEMINI_API_URL}/models/{model}:generateContent"
+        self.batcher = WriteBatcher(self._call_batch, settings.GEMINI_BATCH_WINDOW, max_batch=settings.GEMINI_BATCH_MAX)
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    def cache_key(self, prompt: str) -> str:
+        return "concepts:" + hashlib.sha256(f"{self.model}\n{prompt}".encode()).hexdigest()[:32]
+
+    async def concepts(self, prompt: str) -> Dict[str, List[str]]:
+        """
+        Validated concepts for a prompt. Raises if Gemini fails or returns
+        something invalid; the caller bounds the wait, and a call that
+        outlives it still lands in the cache for the next request.
+        """
+        key = self.cache_key(prompt)
+        if self.state is not None:
+            cached = await self.state.get(key)
+            if cached:
+                CONCEPT_RESULTS.labels(source="cache").inc()
+                return dict(cached)
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(key, prompt))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return dict(await asyncio.shield(task))
+
+    async def _fetch(self, key: str, prompt: str) -> Dict[str, List[str]]:
+        results = await self.batcher.submit((key, prompt))
+        result = results[key]
+        if isinstance(result, Exception):
+            raise result
+        CONCEPT_RESULTS.labels(source="gemini").inc()
+        if self.state is not None:
+            await self.state.set(key, result, ttl=settings.GEMINI_CONCEPT_CACHE_TTL)
+        return result
+
+    def _batch_prompt(self, prompts: List[str]) -> str:
+        if len(prompts) == 1:
+            return f"{prompts[0]}\n\nReturn a JSON array containing exactly one concept set."
+        products = "\n\n".join(f"=== PRODUCT {number} ===\n{prompt}" for number, prompt in enumerate(prompts, 1))
+        return (
+            f"Create packaging concepts for each of the {len(prompts)} products below.\n"
+            f"Return a JSON array of exactly {len(prompts)} concept sets, one per product, in the same order.\n\n"
+            f"{products}"
+        )
+
+    def _call_batch(self, items: List[Tuple[str, str]]) -> Dict[str, Any]:
+        """One generateContent call for a batch (runs in the executor); key -> concepts or the error"""
+        prompts = dict(items)  # the same prompt twice in a batch is asked once
+        keys = list(prompts)
+        body = {
+            "contents": [{"role": "user", "parts": [{"text": self._batch_prompt([prompts[key] for key in keys])}]}],
+            "generationConfig": {
+                "responseMimeType": "application/json",
+                "responseSchema": BATCH_SCHEMA,
+                "temperature": 0.7
+            }
+        }
+
+        with timed_stage("concept_batch", provider="gemini"):
+            response = self.http.post(self.url, json=body, headers={"x-goog-api-key": self.api_key}, timeout=self.timeout)
+            response.raise_for_status()
+            payload = response.json()
+
+        try:
+            concept_sets = json.loads(payload["candidates"][0]["content"]["parts"][0]["text"])
+        except (KeyError, IndexError, ValueError) as e:
+            raise ValueError(f"Unreadable Gemini response: {e}")
+        if not isinstance(concept_sets, list) or len(concept_sets) != len(keys):
+            raise ValueError(f"Gemini returned {len(concept_sets) if isinstance(concept_sets, list) else 'no'} concept sets for {len(keys)} products")
+
+        results: Dict[str, Any] = {}
+        for key, concept_set in zip(keys, concept_sets):
+            try:
+                results[key] = ConceptResponse.model_validate(concept_set).model_dump()
+            except ValidationError as e:
+                results[key] = ValueError(f"Invalid concept set: {e.error_count()} errors")
+        logger.debug("Gemini concept batch", extra={"products": len(keys), "valid": sum(not isinstance(r, Exception) for r in results.values())})
+        return results
+
+    async def close(self):
+        await self.batcher.close()
@@ -3,6 +3,7 @@ DeepAI Image Generation Service for PromptAgro
 Uses DeepAI Text2Image API for reliable agricultural packaging designs
 """
 
+import logging
 import requests
 import asyncio
 import uuid
@@ -10,12 +11,22 @@ from datetime import datetime
 from typing import Dict, Any
 import os
 import base64
+from app.config import settings
+from app.metrics import timed_stage
+from app.services import layout
+
+logger = logging.getLogger(__name__)
 
 class DeepAIImageGenerator:
-    def __init__(self, deepai_api_key: str = ""):
+    def __init__(self, deepai_api_key: str = "", http=None):
         self.deepai_api_key = deepai_api_key
         self.has_deepai = bool(deepai_api_key)
-        self.api_url = "https://api.deepai.org/api/text2img"
+        self.api_url = settings.DEEPAI_API_URL
+        # Shared requests.Session from the app container; plain requests otherwise
+        self.http = http or requests
+        
+        if not self.has_deepai:
+            logger.warning("No DeepAI API key configured, image requests use demo mode")
         
     def create_agricultural_prompt(self, product_data: Dict[str, Any]) -> str:
         """Create professional prompt for agricultural packaging"""
@@ -42,21 +53,20 @@ class DeepAIImageGenerator:
         Generate packaging images using DeepAI Text2Image API
         """
         try:
-            print(f"🎨 Generating image with DeepAI API...")
+            logger.debug("Generating image", extra={"provider": "deepai"})
             
             if not self.has_deepai:
-                print("⚠️ No DeepAI API key found, using demo mode")
                 return await self._create_demo_image(product_data)
             
             # Create the prompt
             prompt = self.create_agricultural_prompt(product_data)
-            print(f"📝 Prompt: {prompt[:100]}...")
+            logger.debug("DeepAI prompt", extra={"prompt": prompt[:100]})
             
             # Generate image via DeepAI API
             loop = asyncio.get_event_loop()
             response = await loop.run_in_executor(
                 None, 
-                lambda: requests.post(
+                lambda: self.http.post(
                     self.api_url,
                     data={'text': prompt},
                     headers={'api-key': self.deepai_api_key},
@@ -71,7 +81,7 @@ class DeepAIImageGenerator:
                 image_url = result['output_url']
                 design_id = f"deepai_{uuid.uuid4().hex[:8]}"
                 
-                print(f"✅ Image generated successfully: {image_url}")
+                logger.info("Image generated", extra={"provider": "deepai", "design_id": design_id, "image_url": image_url})
                 
                 # Optionally download and save the image locally
                 await self._save_image_locally(image_url, design_id)
@@ -85,37 +95,38 @@ class DeepAIImageGenerator:
                     "prompt_used": prompt
                 }
             else:
-                print("❌ No output_url in DeepAI response")
+                logger.warning("No output_url in DeepAI response, using demo image")
                 return await self._create_demo_image(product_data)
                 
         except Exception as e:
-            print(f"❌ DeepAI API error: {str(e)}")
+            logger.warning("DeepAI API error, using demo image", extra={"error": str(e)})
             return await self._create_demo_image(product_data)
     
     async def _save_image_locally(self, image_url: str, design_id: str):
         """Download and save image locally for backup"""
         try:
             loop = asyncio.get_event_loop()
-            image_response = await loop.run_in_executor(
-                None, 
-                lambda: requests.get(image_url, timeout=30)
-            )
+            with timed_stage("download", provider="deepai") as stage:
+                image_response = await loop.run_in_executor(
+                    None, 
+                    lambda: self.http.get(image_url, timeout=30)
+                )
+                if image_response.status_code != 200:
+                    stage["outcome"] = "error"
             
             if image_response.status_code == 200:
                 # Create directories
-                storage_dir = "storage/designs"
-                design_dir = f"{storage_dir}/{design_id}"
-                os.makedirs(design_dir, exist_ok=True)
+                image_path = layout.design_file(design_id, f"{design_id}_deepai.jpg")
+                os.makedirs(os.path.dirname(image_path), exist_ok=True)
                 
                 # Save the image
-                image_path = f"{design_dir}/{design_id}_deepai.jpg"
                 with open(image_path, 'wb') as f:
                     f.write(image_response.content)
                 
-                print(f"📁 Image saved locally: {image_path}")
+                logger.debug("Image saved locally", extra={"image_path": image_path})
                 
         except Exception as e:
-            print(f"Warning: Could not save image locally: {str(e)}")
+            logger.warning("Could not save image locally", extra={"design_id": design_id, "error": str(e)})
     
     async def _create_demo_image(self, product_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a demo image when DeepAI API is not available"""
@@ -210,7 +221,7 @@ class DeepAIImageGenerator:
             }
             
         except Exception as e:
-            print(f"Demo image creation failed: {str(e)}")
+            logger.error("Demo image creation failed, using SVG fallback", extra={"error": str(e)})
             return await self._create_fallback_svg(product_data)
     
     async def _create_fallback_svg(self, product_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -0,0 +1,140 @@
+"""
+File I/O for PKL storage
+Whole-file reads and writes in one executor hop via temp files, and
+small writes (metadata updates, counters, fsyncs) coalesced into batches
+"""
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+import threading
+from typing import Any, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def tmp_path_for(path: str) -> str:
+    """Unique sibling temp name, so the final rename stays on one filesystem"""
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def write_temp(path: str, data: bytes) -> str:
+    """Write data next to path; the caller renames or links it into place"""
+    tmp_path = tmp_path_for(path)
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    return tmp_path
+
+
+def copy_to_temp(source, path: str) -> str:
+    """Copy an open file (e.g. an upload's spooled temp file) next to path"""
+    tmp_path = tmp_path_for(path)
+    source.seek(0)
+    with open(tmp_path, 'wb') as f:
+        shutil.copyfileobj(source, f, 1024 * 1024)
+    return tmp_path
+
+
+def read_json(path: str, default: Any = None) -> Any:
+    try:
+        with open(path, 'r') as f:
+            content = f.read()
+    except FileNotFoundError:
+        return default
+    return json.loads(content) if content else default
+
+
+def fsync_paths(paths: List[str]) -> None:
+    """fsync each file, then each containing directory once (so renames are durable too)"""
+    directories = set()
+    for path in set(paths):
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except FileNotFoundError:
+            continue
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        directories.add(os.path.dirname(path) or ".")
+
+    for directory in directories:
+        try:
+            fd = os.open(directory, os.O_RDONLY)
+        except OSError:  # Windows can't open directories
+            continue
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+class WriteBatcher:
+    """
+    Coalesce small writes (or any calls that batch well): items submitted
+    within `window` seconds, up to `max_batch` of them, are handed together
+    to one call of `apply(items)` in one executor hop. Callers may wait for
+    their batch to land or fire and forget.
+    """
+
+    def __init__(self, apply: Callable[[List[Any]], Any], window: float, max_batch: Optional[int] = None):
+        self.apply = apply
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: List[tuple] = []
+        self._task: Optional[asyncio.Task] = None
+        self._full: set = set()
+
+    async def submit(self, item: Any, wait: bool = True) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future() if wait else None
+        self._pending.append((item, future))
+        if self.max_batch and len(self._pending) >= self.max_batch:
+            # Full: send now rather than waiting out the window
+            if self._task is not None:
+                self._task.cancel()
+                self._task = None
+            batch, self._pending = self._pending, []
+            task = loop.create_task(self._flush(batch))
+            self._full.add(task)
+            task.add_done_callback(self._full.discard)
+        elif self._task is None:
+            self._task = loop.create_task(self._flush_later())
+        if future is not None:
+            return await future
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.window)
+        self._task = None
+        await self._flush()
+
+    async def _flush(self, batch: Optional[List[tuple]] = None):
+        if batch is None:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(None, self.apply, [item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            if all(future is None for _, future in batch):
+                logger.warning("Batched write failed", extra={"items": len(batch), "error": str(e)})
+            return
+        for _, future in batch:
+            if future is not None and not future.done():
+                future.set_result(result)
+
+    async def close(self):
+        """Apply anything still pending (call before shutdown)"""
+        if self._task is not None:
+            await self._task
+        if self._full:
+            await asyncio.gather(*self._full)
+        await self._flush()
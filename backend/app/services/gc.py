@@ -0,0 +1,152 @@
+"""
+Storage Garbage Collection for PKL
+Removes expired, unsaved designs and their uploads in rate-limited batches
+on a worker thread, keeping anything referenced by a saved design. Files
+are released through the blob store, so shared blobs survive until their
+last link goes
+"""
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+import time
+from typing import Any, Dict, List, Set, Tuple
+
+from app.config import settings
+from app.metrics import GC_RECLAIMED_BYTES, publish_storage_stats
+from app.services import layout
+from app.services.storage import STATS_COUNTERS, file_lock
+
+logger = logging.getLogger(__name__)
+
+
+def _newest_mtime(path: str) -> float:
+    """Latest modification time anywhere below a design folder"""
+    newest = os.path.getmtime(path)
+    for dirpath, dirnames, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                newest = max(newest, os.path.getmtime(os.path.join(dirpath, filename)))
+            except OSError:
+                pass
+    return newest
+
+
+class StorageGC:
+    """One garbage-collection pass over a StorageService's tree"""
+
+    def __init__(self, storage, batch_size: int = None, batch_pause: float = None):
+        self.storage = storage
+        self.batch_size = batch_size or settings.GC_BATCH_SIZE
+        self.batch_pause = settings.GC_BATCH_PAUSE if batch_pause is None else batch_pause
+
+    def _saved_design_ids(self) -> Set[str]:
+        try:
+            with open(self.storage.metadata_file, 'r') as f:
+                content = f.read()
+            metadata = json.loads(content) if content else {}
+        except FileNotFoundError:
+            return set()
+        return {data.get("originalDesignId") for data in metadata.values() if isinstance(data, dict)}
+
+    def _candidates(self, cutoff: float) -> List[Tuple[str, str]]:
+        """(path, kind) for everything past retention and not kept by a saved design"""
+        keep = self._saved_design_ids()
+        candidates = []
+
+        for entry in layout.iter_design_dirs(self.storage.designs_dir):
+            if entry.name not in keep and _newest_mtime(entry.path) < cutoff:
+                candidates.append((entry.path, "design"))
+
+        for entry in layout.iter_uploads(self.storage.upload_dir):
+            design_id = entry.name.split("_original")[0]
+            if design_id not in keep and entry.stat().st_mtime < cutoff:
+                candidates.append((entry.path, "upload"))
+
+        for entry in os.scandir(self.storage.mockups_dir):
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                candidates.append((entry.path, "mockup"))
+
+        return candidates
+
+    def collect(self, retention_days: float) -> Dict[str, Any]:
+        """Delete expired entries batch by batch, pausing between batches"""
+        started = time.monotonic()
+        cutoff = time.time() - retention_days * 24 * 60 * 60
+        candidates = self._candidates(cutoff)
+        report = {"designs_removed": 0, "uploads_removed": 0, "files_removed": 0, "bytes_reclaimed": 0, "object_keys": []}
+
+        for index in range(0, len(candidates), self.batch_size):
+            deltas = dict.fromkeys(STATS_COUNTERS, 0)
+            for path, kind in candidates[index:index + self.batch_size]:
+                try:
+                    if kind == "design":
+                        files, size = 0, 0
+                        for dirpath, dirnames, filenames in os.walk(path):
+                            for name in filenames:
+                                file_path = os.path.join(dirpath, name)
+                                if name.startswith("."):
+                                    continue
+                                if self.storage.objects.remote:
+                                    report["object_keys"].append(self.storage.object_key(file_path))
+                                size += self.storage.blobs.release(file_path)
+                                files += 1
+                        shutil.rmtree(path)
+                        deltas["total_designs"] -= 1
+                        report["designs_removed"] += 1
+                    else:
+                        if self.storage.objects.remote:
+                            report["object_keys"].append(self.storage.object_key(path))
+                        files, size = 1, self.storage.blobs.release(path)
+                        if kind == "upload":
+                            deltas["total_uploads"] -= 1
+                            report["uploads_removed"] += 1
+                except FileNotFoundError:
+                    continue
+                except OSError as e:
+                    logger.warning("GC delete failed", extra={"path": path, "error": str(e)})
+                    continue
+
+                deltas["total_files"] -= files
+                deltas["total_bytes"] -= size
+                report["files_removed"] += files
+                report["bytes_reclaimed"] += size
+
+            if any(deltas.values()):
+                publish_storage_stats(self.storage._adjust_stats(deltas))
+            if index + self.batch_size < len(candidates):
+                time.sleep(self.batch_pause)
+
+        report["duration_s"] = round(time.monotonic() - started, 3)
+        return report
+
+    def _collect_exclusive(self, retention_days: float) -> Dict[str, Any]:
+        """Run collect() unless another worker process is already collecting"""
+        try:
+            with file_lock(os.path.join(self.storage.root, "gc"), blocking=False):
+                return self.collect(retention_days)
+        except BlockingIOError:
+            return {"skipped": True}
+
+    async def run(self, retention_days: float = None) -> Dict[str, Any]:
+        """One pass on the executor, then remove the deleted files' remote copies"""
+        retention_days = settings.GC_RETENTION_DAYS if retention_days is None else retention_days
+        loop = asyncio.get_event_loop()
+        report = await loop.run_in_executor(None, lambda: self._collect_exclusive(retention_days))
+        if report.get("skipped"):
+            return report
+
+        keys = [key for key in report.pop("object_keys") if key]
+        semaphore = asyncio.Semaphore(settings.OBJECT_STORE_CONCURRENCY)
+
+        async def delete(key: str):
+            async with semaphore:
+                await self.storage.objects.delete(key)
+
+        await asyncio.gather(*(delete(key) for key in keys), return_exceptions=True)
+
+        GC_RECLAIMED_BYTES.inc(report["bytes_reclaimed"])
+        logger.info("Storage GC finished", extra=report)
+        return report
@@ -3,14 +3,19 @@ Google Gemini Vision Service
 Generates packaging mockups from product images
 """
 
+import logging
 import base64
+import time
 import aiohttp
 import asyncio
 from typing import Dict, Any, Optional
 from app.config import get_settings
+from app.services import layout
 
 settings = get_settings()
 
+logger = logging.getLogger(__name__)
+
 class GeminiService:
     def __init__(self):
         self.api_key = settings.GEMINI_API_KEY
@@ -65,7 +70,7 @@ class GeminiService:
                 return await self._get_sample_mockup()
         
         except Exception as e:
-            print(f"Gemini API error: {e}")
+            logger.warning("Gemini API error, using sample mockup", extra={"error": str(e)})
             return await self._get_sample_mockup()
     
     async def apply_customizations(
@@ -81,7 +86,7 @@ class GeminiService:
             prompt = self._build_customization_prompt(customizations)
             
             # Load existing design
-            existing_design_path = f"storage/designs/{design_id}/mockup.jpg"
+            existing_design_path = layout.design_file(design_id, "mockup.jpg")
             image_data = await self._encode_image(existing_design_path)
             
             # Apply customizations via API
@@ -102,7 +107,7 @@ class GeminiService:
                 return await self._get_sample_mockup()
         
         except Exception as e:
-            print(f"Customization error: {e}")
+            logger.warning("Customization failed, using sample mockup", extra={"design_id": design_id, "error": str(e)})
             return await self._get_sample_mockup()
     
     async def _encode_image(self, image_path: str) -> str:
@@ -169,6 +174,7 @@ class GeminiService:
     
     async def _call_gemini_api(self, image_data: str, prompt: str) -> Dict[str, Any]:
         """Make API call to Gemini Vision"""
+        started = time.perf_counter()
         try:
             url = f"{self.base_url}/models/{self.model}:generateContent?key={self.api_key}"
             
@@ -193,7 +199,7 @@ class GeminiService:
                         return {
                             "success": True,
                             "generated_image": data.get("candidates", [{}])[0].get("content", {}),
-                            "processing_time": 3.2,
+                            "processing_time": round(time.perf_counter() - started, 4),
                             "confidence": 0.88
                         }
                     else:
@@ -210,7 +216,7 @@ class GeminiService:
     
     async def _save_customized_mockup(self, generated_data: Any, design_id: str) -> str:
         """Save customized mockup to storage"""
-        return f"storage/designs/{design_id}/customized_mockup.jpg"
+        return layout.design_file(design_id, "customized_mockup.jpg")
     
     async def _get_sample_mockup(self) -> Dict[str, Any]:
         """Return sample mockup for testing"""
@@ -0,0 +1,132 @@
+"""
+Upload Normalization for PKL
+Every product photo is sniffed, decoded, stripped of metadata, downsized
+to what the image providers can use and re-encoded before it is stored,
+so nothing oversized or corrupt reaches storage, providers or base64
+"""
+
+import asyncio
+import io
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Leading bytes -> format; the decoder must agree with what the bytes claim
+MAGIC_NUMBERS = (
+    (b"\xff\xd8\xff", "JPEG"),
+    (b"\x89PNG\r\n\x1a\n", "PNG"),
+    (b"GIF87a", "GIF"),
+    (b"GIF89a", "GIF"),
+    (b"BM", "BMP"),
+)
+
+# What Pillow may report for a sniffed format: phone cameras write MPO
+# (a JPEG with extra frames appended), which decodes as frame 0
+DECODED_FORMATS = {"JPEG": ("JPEG", "MPO")}
+
+
+class InvalidImage(ValueError):
+    """The upload is not an image we accept"""
+
+
+@dataclass
+class NormalizedImage:
+    data: bytes
+    format: str
+    width: int
+    height: int
+    original_bytes: int
+
+    @property
+    def ext(self) -> str:
+        return ".png" if self.format == "PNG" else ".jpg"
+
+    @property
+    def content_type(self) -> str:
+        return "image/png" if self.format == "PNG" else "image/jpeg"
+
+
+def sniff_format(header: bytes) -> Optional[str]:
+    """Image format from magic bytes, ignoring filename and client content type"""
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "WEBP"
+    for magic, image_format in MAGIC_NUMBERS:
+        if header.startswith(magic):
+            return image_format
+    return None
+
+
+def normalize_image(data: bytes, max_side: int = None, quality: int = None) -> NormalizedImage:
+    """
+    Validate and re-encode image bytes (CPU-bound; run it in the image pool).
+    JPEGs are decoded in draft mode, letting libjpeg scale by 1/2-1/8 while
+    decoding, so a 12 MP phone photo never materializes at full size.
+    """
+    from PIL import Image, ImageOps
+
+    max_side = max_side or settings.UPLOAD_MAX_SIDE
+    quality = quality or settings.UPLOAD_JPEG_QUALITY
+
+    if len(data) > settings.UPLOAD_MAX_BYTES:
+        raise InvalidImage("File too large")
+    sniffed = sniff_format(data[:16])
+    if sniffed is None:
+        raise InvalidImage("Unsupported or unrecognized image format")
+
+    try:
+        img = Image.open(io.BytesIO(data))
+        if img.format not in DECODED_FORMATS.get(sniffed, (sniffed,)):
+            raise InvalidImage("Image content does not match its format")
+        if img.width * img.height > settings.UPLOAD_MAX_PIXELS:
+            raise InvalidImage("Image dimensions too large")
+
+        img.seek(0)
+        if sniffed == "JPEG":
+            img.draft("RGB", (max_side, max_side))
+        img.load()
+
+        # Bake EXIF orientation into the pixels; the metadata is dropped on save
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+
+        has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+        buffer = io.BytesIO()
+        if has_alpha:
+            img.convert("RGBA").save(buffer, format="PNG", optimize=True)
+            out_format = "PNG"
+        else:
+            img.convert("RGB").save(buffer, format="JPEG", quality=quality, optimize=True, progressive=True)
+            out_format = "JPEG"
+    except InvalidImage:
+        raise
+    except (OSError, SyntaxError, ValueError, Image.DecompressionBombError) as e:
+        raise InvalidImage(f"Corrupt or unreadable image: {e}")
+
+    return NormalizedImage(
+        data=buffer.getvalue(),
+        format=out_format,
+        width=img.width,
+        height=img.height,
+        original_bytes=len(data)
+    )
+
+
+async def normalize_upload(upload, executor=None) -> NormalizedImage:
+    """Read an UploadFile and normalize it on the given pool (default executor if None)"""
+    def run():
+        upload.file.seek(0)
+        data = upload.file.read(settings.UPLOAD_MAX_BYTES + 1)
+        return normalize_image(data)
+
+    loop = asyncio.get_event_loop()
+    image = await loop.run_in_executor(executor, run)
+    logger.debug("Upload normalized", extra={
+        "original_bytes": image.original_bytes,
+        "normalized_bytes": len(image.data),
+        "size": f"{image.width}x{image.height}"
+    })
+    return image
@@ -0,0 +1,76 @@
+"""
+Storage Layout for PKL
+Hash-prefix sharded paths so no directory grows past a few hundred entries:
+
+    storage/designs/ab/cd/<design_id>/mockup.jpg
+    storage/uploads/ab/cd/<design_id>_original.jpg
+
+Paths are computed from the design id alone, so nothing on the request
+path lists a directory. The iterators are for maintenance jobs only.
+"""
+
+import hashlib
+import os
+from typing import Iterator, Optional, Tuple
+
+STORAGE_ROOT = "storage"
+DESIGNS_DIR = os.path.join(STORAGE_ROOT, "designs")
+UPLOADS_DIR = os.path.join(STORAGE_ROOT, "uploads")
+MOCKUPS_DIR = os.path.join(STORAGE_ROOT, "mockups")
+
+
+def shard(key: str) -> str:
+    """Two levels of 256 buckets each, e.g. "3f/a2" """
+    digest = hashlib.sha1(key.encode()).hexdigest()
+    return os.path.join(digest[:2], digest[2:4])
+
+
+def is_shard_name(name: str) -> bool:
+    return len(name) == 2 and all(c in "0123456789abcdef" for c in name)
+
+
+def design_dir(design_id: str, designs_dir: str = DESIGNS_DIR) -> str:
+    return os.path.join(designs_dir, shard(design_id), design_id)
+
+
+def design_file(design_id: str, filename: str, designs_dir: str = DESIGNS_DIR) -> str:
+    return os.path.join(design_dir(design_id, designs_dir), filename)
+
+
+def upload_path(design_id: str, ext: str = ".jpg", uploads_dir: str = UPLOADS_DIR) -> str:
+    return os.path.join(uploads_dir, shard(design_id), f"{design_id}_original{ext}")
+
+
+def design_of(file_path: str, designs_dir: str = DESIGNS_DIR) -> Optional[Tuple[str, str]]:
+    """(design_id, filename) for a file directly inside a sharded design folder"""
+    relative = os.path.relpath(file_path, designs_dir)
+    parts = relative.split(os.sep)
+    if len(parts) != 4 or not is_shard_name(parts[0]) or not is_shard_name(parts[1]):
+        return None
+    return parts[2], parts[3]
+
+
+def _shard_dirs(base: str) -> Iterator[str]:
+    if not os.path.isdir(base):
+        return
+    for first in os.scandir(base):
+        if first.is_dir() and is_shard_name(first.name):
+            for second in os.scandir(first.path):
+                if second.is_dir() and is_shard_name(second.name):
+                    yield second.path
+
+
+def iter_design_dirs(designs_dir: str = DESIGNS_DIR) -> Iterator[os.DirEntry]:
+    """Every design folder (maintenance only: walks all shards)"""
+    for shard_dir in _shard_dirs(designs_dir):
+        for entry in os.scandir(shard_dir):
+            if entry.is_dir():
+                yield entry
+
+
+def iter_uploads(uploads_dir: str = UPLOADS_DIR) -> Iterator[os.DirEntry]:
+    """Every stored upload, skipping in-progress temp files (maintenance only)"""
+    for shard_dir in _shard_dirs(uploads_dir):
+        for entry in os.scandir(shard_dir):
+            if entry.is_file() and not entry.name.endswith((".tmp", ".link")):
+                yield entry
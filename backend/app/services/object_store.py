@@ -0,0 +1,206 @@
+"""
+Object Storage Service for PKL
+Where design artifacts live: the local storage/ directory, or an
+S3-compatible bucket (AWS S3, MinIO, R2, ...) shared by every backend node
+"""
+
+import asyncio
+import os
+import shutil
+from typing import Iterable, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+
+class LocalObjectStore:
+    """Objects are files under a root directory; keys are relative paths"""
+
+    remote = False
+
+    def __init__(self, root: str = "storage"):
+        self.root = root
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, *key.split("/"))
+
+    async def put_file(self, key: str, file_path: str, content_type: Optional[str] = None) -> None:
+        target = self.path(key)
+        if os.path.abspath(target) == os.path.abspath(file_path):
+            return
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, lambda: self._copy(file_path, target))
+
+    def _copy(self, source: str, target: str):
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copyfile(source, target)
+
+    async def get_file(self, key: str, file_path: str) -> None:
+        source = self.path(key)
+        if os.path.abspath(source) == os.path.abspath(file_path):
+            return
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, lambda: self._copy(source, file_path))
+
+    async def exists(self, key: str) -> bool:
+        return os.path.isfile(self.path(key))
+
+    async def delete(self, key: str) -> None:
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    async def presigned_url(self, key: str, expires: int = 3600, method: str = "GET") -> Optional[str]:
+        """Local files are served by the API itself; nothing to sign"""
+        return None
+
+    async def check_health(self) -> bool:
+        return os.access(self.root, os.W_OK)
+
+    async def close(self) -> None:
+        pass
+
+
+class S3ObjectStore:
+    """
+    Objects in an S3-compatible bucket. Transfers run on the executor with
+    boto3's managed transfer: multipart above multipart_mb, parts in
+    parallel. Credentials come from the usual AWS_* environment variables.
+    """
+
+    remote = True
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "",
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        multipart_mb: int = 8,
+        concurrency: int = 8,
+        public_endpoint_url: Optional[str] = None
+    ):
+        import boto3
+        from boto3.s3.transfer import TransferConfig
+        from botocore.config import Config
+
+        def client(endpoint: Optional[str]):
+            return boto3.client(
+                "s3",
+                endpoint_url=endpoint,
+                region_name=region,
+                config=Config(
+                    max_pool_connections=max(10, concurrency * 2),
+                    # MinIO-style servers are usually addressed by path, not subdomain
+                    s3={"addressing_style": "path" if endpoint else "auto"},
+                    retries={"max_attempts": 3, "mode": "standard"}
+                )
+            )
+
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.client = client(endpoint_url)
+        # The signature covers the host, so URLs for browsers are signed
+        # against the endpoint they can reach (e.g. localhost, not the
+        # compose service name)
+        self.signer = client(public_endpoint_url) if public_endpoint_url else self.client
+        self.transfer_config = TransferConfig(
+            multipart_threshold=multipart_mb * 1024 * 1024,
+            multipart_chunksize=multipart_mb * 1024 * 1024,
+            max_concurrency=concurrency,
+            use_threads=True
+        )
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    async def _run(self, fn):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, fn)
+
+    async def put_file(self, key: str, file_path: str, content_type: Optional[str] = None) -> None:
+        extra_args = {"ContentType": content_type} if content_type else None
+        await self._run(lambda: self.client.upload_file(
+            file_path, self.bucket, self._key(key), ExtraArgs=extra_args, Config=self.transfer_config
+        ))
+
+    async def get_file(self, key: str, file_path: str) -> None:
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        tmp_path = f"{file_path}.{os.getpid()}.tmp"
+        await self._run(lambda: self.client.download_file(
+            self.bucket, self._key(key), tmp_path, Config=self.transfer_config
+        ))
+        os.replace(tmp_path, file_path)
+
+    async def exists(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+
+        try:
+            await self._run(lambda: self.client.head_object(Bucket=self.bucket, Key=self._key(key)))
+            return True
+        except ClientError:
+            return False
+
+    async def delete(self, key: str) -> None:
+        await self._run(lambda: self.client.delete_object(Bucket=self.bucket, Key=self._key(key)))
+
+    async def presigned_url(self, key: str, expires: int = 3600, method: str = "GET") -> Optional[str]:
+        """Signed GET (download) or PUT (direct upload) URL; signing is local, no request"""
+        operation = "put_object" if method == "PUT" else "get_object"
+        return self.signer.generate_presigned_url(
+            operation,
+            Params={"Bucket": self.bucket, "Key": self._key(key)},
+            ExpiresIn=expires
+        )
+
+    async def check_health(self) -> bool:
+        try:
+            await self._run(lambda: self.client.head_bucket(Bucket=self.bucket))
+            return True
+        except Exception:
+            return False
+
+    async def close(self) -> None:
+        close = getattr(self.client, "close", None)
+        if close:
+            close()
+
+
+async def put_many(store, items: Iterable[Tuple[str, str, Optional[str]]], concurrency: int = 8) -> None:
+    """Upload (key, file_path, content_type) triples in parallel, at most `concurrency` at a time"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def put(key: str, file_path: str, content_type: Optional[str]):
+        async with semaphore:
+            await store.put_file(key, file_path, content_type)
+
+    await asyncio.gather(*(put(*item) for item in items))
+
+
+def create_object_store(
+    url: str,
+    default_bucket: str = "",
+    multipart_mb: int = 8,
+    concurrency: int = 8,
+    public_endpoint_url: Optional[str] = None
+):
+    """
+    Build the object store for a URL.
+    file://storage (or empty) keeps artifacts on local disk;
+    s3://bucket/prefix?endpoint_url=http://minio:9000&region=us-east-1 uses a bucket.
+    public_endpoint_url is where clients reach the bucket, if not endpoint_url.
+    """
+    if not url or url.startswith("file://"):
+        return LocalObjectStore(url[len("file://"):] if url else "storage")
+    if url.startswith("s3://"):
+        parsed = urlparse(url)
+        query = {name: values[0] for name, values in parse_qs(parsed.query).items()}
+        return S3ObjectStore(
+            bucket=parsed.netloc or default_bucket,
+            prefix=parsed.path,
+            endpoint_url=query.get("endpoint_url"),
+            region=query.get("region"),
+            multipart_mb=multipart_mb,
+            concurrency=concurrency,
+            public_endpoint_url=public_endpoint_url
+        )
+    raise ValueError(f"Unsupported object store URL: {url}")
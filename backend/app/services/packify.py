@@ -3,6 +3,7 @@ Packify.ai Service Integration
 Generates packaging text concepts and design suggestions
 """
 
+import logging
 import aiohttp
 import asyncio
 from typing import Dict, Any, List
@@ -10,6 +11,8 @@ from app.config import get_settings
 
 settings = get_settings()
 
+logger = logging.getLogger(__name__)
+
 class PackifyService:
     def __init__(self):
         self.base_url = "https://api.packify.ai/v1"
@@ -62,7 +65,7 @@ class PackifyService:
                         return self._get_fallback_concepts(product_data)
         
         except Exception as e:
-            print(f"Packify API error: {e}")
+            logger.warning("Packify API error", extra={"error": str(e)})
             return self._get_fallback_concepts(product_data)
     
     def _format_concepts_response(self, api_data: Dict) -> Dict[str, Any]:
@@ -3,21 +3,52 @@ PKL AI Service - DeepAI + Gemini Stack
 Uses Gemini for text + DeepAI for reliable image generation
 """
 
+import logging
 import json
+import time
 import asyncio
 from typing import Dict, Any, List
-from .deepai_generator import DeepAIImageGenerator
+from app.config import settings
+from app.metrics import CONCEPT_RESULTS
+from .providers import get_provider
+from .rules import get_rules
 from .text_advisor import create_smart_packaging_advice, create_concept_summary
 
+logger = logging.getLogger(__name__)
+
 class PKLAI:
-    def __init__(self, gemini_api_key: str):
+    def __init__(self, gemini_api_key: str, http=None, state=None):
         self.api_key = gemini_api_key
-        self.model = "gemini-1.5-flash"
+        self.model = settings.GEMINI_CONCEPT_MODEL
         self.timeout = 30
-        # Initialize DeepAI image generator
-        from app.config import settings
-        deepai_key = getattr(settings, 'DEEPAI_API_KEY', '')
-        self.image_generator = DeepAIImageGenerator(deepai_key)
+        self.http = http
+        self.state = state
+        self._image_generator = None
+        self._concept_engine = None
+    
+    @property
+    def image_generator(self):
+        """DeepAI image generator, imported and built on first use"""
+        if self._image_generator is None:
+            deepai_key = getattr(settings, 'DEEPAI_API_KEY', '')
+            self._image_generator = get_provider("deepai")(deepai_key, http=self.http)
+        return self._image_generator
+    
+    @property
+    def has_gemini(self) -> bool:
+        return bool(self.http is not None and self.api_key and self.api_key != "your_gemini_api_key_here")
+    
+    @property
+    def concept_engine(self):
+        """Gemini concept engine, imported and built on first use"""
+        if self._concept_engine is None:
+            from .concepts import GeminiConceptEngine
+            self._concept_engine = GeminiConceptEngine(self.api_key, self.model, self.http, self.state, timeout=self.timeout)
+        return self._concept_engine
+    
+    async def close(self):
+        if self._concept_engine is not None:
+            await self._concept_engine.close()
     
     async def check_health(self) -> bool:
         """Check if our AI service is working"""
@@ -29,16 +60,24 @@ class PKLAI:
     
     async def generate_packaging_concepts(self, product_data: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Generate packaging concepts using Gemini Pro
+        Generate packaging concepts using Gemini
         This replaces Packify.ai entirely
         """
         try:
             # Build comprehensive prompt for packaging concepts
             prompt = self._build_concept_prompt(product_data)
             
-            # For now, return smart fallback concepts
-            # You can later integrate real Gemini API calls here
+            # Gemini gets GEMINI_CONCEPT_BUDGET seconds; after that the rule tables answer
+            if self.has_gemini:
+                try:
+                    return await asyncio.wait_for(self.concept_engine.concepts(prompt), timeout=settings.GEMINI_CONCEPT_BUDGET)
+                except asyncio.TimeoutError:
+                    logger.warning("Gemini concepts over budget, using rule tables", extra={"budget": settings.GEMINI_CONCEPT_BUDGET})
+                except Exception as e:
+                    logger.warning("Gemini concepts failed, using rule tables", extra={"error": str(e)})
+            
             concepts = await self._get_ai_concepts(product_data, prompt)
+            CONCEPT_RESULTS.labels(source="rules").inc()
             
             return {
                 "text_concepts": concepts["concepts"],
@@ -49,7 +88,7 @@ class PKLAI:
             }
         
         except Exception as e:
-            print(f"AI Concept generation error: {e}")
+            logger.warning("Concept generation failed, using fallback concepts", extra={"error": str(e)})
             return self._get_intelligent_fallback(product_data)
     
     async def generate_packaging_mockup(
@@ -61,20 +100,21 @@ class PKLAI:
         """
         Generate packaging mockup using Replicate Stability AI SDXL
         """
+        started = time.perf_counter()
         try:
-            print("🎨 Generating real AI image using DeepAI Text2Image...")
+            logger.debug("Generating mockup", extra={"provider": "deepai"})
             
             # Use the DeepAI image generator
             result = await self.image_generator.generate_packaging_image(product_data)
             
             if result.get("success"):
-                print(f"✅ Image generated successfully with {result.get('generator')} - Cost: {result.get('cost')}")
+                logger.info("Mockup generated", extra={"generator": result.get("generator"), "cost": result.get("cost")})
                 
                 # Check if we have professional advice from the fallback
                 response_data = {
                     "image_path": result["image_url"],
                     "design_id": result["design_id"],
-                    "processing_time": 3.8,
+                    "processing_time": round(time.perf_counter() - started, 4),
                     "dimensions": {"width": 1024, "height": 1024},
                     "quality_score": 0.92,
                     "ai_confidence": 0.94,
@@ -99,7 +139,7 @@ class PKLAI:
                 return self._get_sample_mockup(product_data)
             
         except Exception as e:
-            print(f"DeepAI generation error: {e}")
+            logger.warning("Mockup generation failed, using text advice", extra={"error": str(e)})
             return self._get_sample_mockup(product_data)
     
     def _build_concept_prompt(self, product_data: Dict) -> str:
@@ -109,6 +149,8 @@ class PKLAI:
         emotion = product_data.get("desiredEmotion", "trust")
         platform = product_data.get("salesPlatform", "local-market")
         story = product_data.get("productStory", "")
+        colors = product_data.get("preferredColors") or []
+        language = product_data.get("language", "en")
         
         prompt = f"""
 You are a professional packaging designer and brand strategist. Create comprehensive packaging concepts for an agricultural product.
@@ -119,6 +161,7 @@ PRODUCT DETAILS:
 - Desired Emotion: {emotion}
 - Sales Platform: {platform}
 - Product Story: {story}
+- Preferred Colors: {", ".join(colors) if isinstance(colors, list) else colors}
 
 GENERATE:
 1. Three unique packaging concept names that evoke {emotion} and suit {platform}
@@ -130,7 +173,8 @@ GENERATE:
 Focus on agricultural authenticity, shelf impact, and {platform} market appeal.
 Ensure concepts work for {emotion} emotion and tell the product story effectively.
 
-Format as structured data that's easy to parse.
+Return text_concepts, style_suggestions, color_palette, emotional_keywords and layout_suggestions.
+Write names, styles, keywords and layouts in the language with code "{language}"; colors stay hex codes.
 """
         return prompt.strip()
     
@@ -169,63 +213,16 @@ Generate a high-quality, realistic packaging mockup that would attract customers
         emotion = product_data.get("desiredEmotion", "trust")
         platform = product_data.get("salesPlatform", "local-market")
         
-        # Intelligent concept generation based on inputs
-        base_concepts = {
-            "trust": [
-                f"Premium {product_name} - Trusted Quality",
-                f"Farm-Fresh {product_name} - Nature's Best", 
-                f"Authentic {product_name} - Heritage Crafted"
-            ],
-            "excitement": [
-                f"Bold {product_name} - Adventure Awaits",
-                f"Vibrant {product_name} - Energy Unleashed",
-                f"Dynamic {product_name} - Pure Excitement"
-            ],
-            "calm": [
-                f"Peaceful {product_name} - Serenity Found",
-                f"Gentle {product_name} - Natural Harmony",
-                f"Pure {product_name} - Tranquil Essence"
-            ]
-        }
-        
-        style_map = {
-            "local-market": ["Rustic Artisan", "Traditional Heritage", "Community Crafted"],
-            "premium-retail": ["Modern Premium", "Elegant Sophisticated", "Luxury Natural"],
-            "online": ["Clean Modern", "Instagram-Ready", "Digital Native"]
-        }
-        
-        color_schemes = {
-            "trust": ["#2E7D32", "#8BC34A", "#FFC107", "#795548"],
-            "excitement": ["#FF5722", "#FF9800", "#4CAF50", "#F44336"],
-            "calm": ["#4CAF50", "#81C784", "#A5D6A7", "#C8E6C9"]
-        }
-        
-        return {
-            "concepts": base_concepts.get(emotion, base_concepts["trust"]),
-            "styles": style_map.get(platform, style_map["local-market"]),
-            "colors": color_schemes.get(emotion, color_schemes["trust"]),
-            "emotions": [emotion.title(), "Quality", "Natural", "Fresh"],
-            "layouts": ["Typography Focus", "Image Dominant", "Balanced Composition"]
-        }
+        # Concept templates, styles and colors come from the precompiled rule table
+        return get_rules().concepts_for(product_name, emotion, platform)
     
     def _get_intelligent_fallback(self, product_data: Dict) -> Dict[str, Any]:
         """Smart fallback when AI fails"""
-        product_name = product_data.get("productName", "Product")
-        
-        return {
-            "text_concepts": [
-                f"Premium {product_name} - Farm Fresh Quality",
-                f"Natural {product_name} - Sustainably Grown",
-                f"Artisan {product_name} - Traditionally Crafted"
-            ],
-            "style_suggestions": ["Modern Organic", "Rustic Premium", "Clean Natural"],
-            "color_palette": ["#2E7D32", "#8BC34A", "#FFC107", "#795548"],
-            "emotional_keywords": ["Quality", "Natural", "Fresh", "Trusted"],
-            "layout_suggestions": ["Typography Focus", "Natural Elements", "Clean Layout"]
-        }
+        return get_rules().fallback_concepts(product_data.get("productName", "Product"))
     
     def _get_sample_mockup(self, product_data: Dict = None) -> Dict[str, Any]:
         """Return professional text advice when image generation isn't available"""
+        started = time.perf_counter()
         
         # Create smart text advice for the user
         if product_data:
@@ -240,7 +237,7 @@ Generate a high-quality, realistic packaging mockup that would attract customers
         # Create a professional text-based response
         return {
             "image_path": "text_advice",
-            "processing_time": 0.5,
+            "processing_time": round(time.perf_counter() - started, 4),
             "dimensions": {"width": "responsive", "height": "adaptive"},
             "quality_score": 0.95,  # High quality advice!
             "ai_confidence": 0.98,  # Very confident in our advice
@@ -0,0 +1,45 @@
+"""
+Provider Registry for PKL
+Maps provider and renderer names to import paths so heavy SDKs
+(replicate, requests, Pillow, ReportLab) are imported on first use
+instead of at every worker boot
+"""
+
+import importlib
+from typing import Any, Callable, Dict
+
+# Image generation providers
+PROVIDERS: Dict[str, str] = {
+    "deepai": "app.services.deepai_generator:DeepAIImageGenerator",
+    "replicate": "app.services.replicate_generator:ReplicateImageGenerator",
+}
+
+# Design report renderers
+RENDERERS: Dict[str, str] = {
+    "text": "app.utils_simple:create_pdf_report",
+    "pdf": "app.utils:create_pdf_report",
+}
+
+_resolved: Dict[str, Any] = {}
+
+
+def _resolve(path: str) -> Any:
+    """Import "module:attribute" once and cache the result"""
+    if path not in _resolved:
+        module_name, attribute = path.split(":")
+        _resolved[path] = getattr(importlib.import_module(module_name), attribute)
+    return _resolved[path]
+
+
+def get_provider(name: str) -> Any:
+    """Provider class by name, importing its module on first use"""
+    if name not in PROVIDERS:
+        raise KeyError(f"Unknown image provider: {name}")
+    return _resolve(PROVIDERS[name])
+
+
+def get_renderer(name: str) -> Callable:
+    """Report renderer by name, importing its module on first use"""
+    if name not in RENDERERS:
+        raise KeyError(f"Unknown report renderer: {name}")
+    return _resolve(RENDERERS[name])
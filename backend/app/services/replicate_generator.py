@@ -3,23 +3,31 @@ Replicate AI Image Generation Service for PKL
 Uses Stability AI SDXL via Replicate API for high-quality agricultural packaging designs
 """
 
-import replicate
+import logging
 import asyncio
 import uuid
 from datetime import datetime
 from typing import Dict, Any
 import os
 
+logger = logging.getLogger(__name__)
+
 class ReplicateImageGenerator:
     def __init__(self, replicate_api_key: str = ""):
         self.replicate_api_key = replicate_api_key
         self.has_replicate = bool(replicate_api_key)
-        
-        # Initialize Replicate client
-        if self.has_replicate:
-            self.client = replicate.Client(api_token=replicate_api_key)
-        else:
-            self.client = None
+        self._client = None
+    
+    @property
+    def client(self):
+        """Replicate client, created (and the SDK imported) on first use"""
+        if self._client is None and self.has_replicate:
+            import replicate
+            from app.config import settings
+            
+            client_options = {"base_url": settings.REPLICATE_API_BASE_URL} if settings.REPLICATE_API_BASE_URL else {}
+            self._client = replicate.Client(api_token=self.replicate_api_key, **client_options)
+        return self._client
         
     def create_agricultural_prompt(self, product_data: Dict[str, Any]) -> str:
         """Create professional prompt for agricultural packaging with better text rendering"""
@@ -51,15 +59,15 @@ class ReplicateImageGenerator:
         Generate packaging images using Stability AI SDXL via Replicate
         """
         try:
-            print(f"🎨 Generating image with Replicate API...")
+            logger.debug("Generating image", extra={"provider": "replicate"})
             
             if not self.has_replicate or not self.client:
-                print("⚠️ No Replicate API key found, using demo mode")
+                logger.debug("No Replicate API key configured, using demo mode")
                 return await self._create_demo_image(product_data)
             
             # Create the prompt
             prompt = self.create_agricultural_prompt(product_data)
-            print(f"📝 Prompt: {prompt}")
+            logger.debug("Replicate prompt", extra={"prompt": prompt})
             
             # Generate image via Replicate API using Google Imagen-3-Fast (best for text)
             loop = asyncio.get_event_loop()
@@ -80,7 +88,7 @@ class ReplicateImageGenerator:
                 )
             )
             
-            print(f"🔍 Raw Replicate result: {type(result)} - {result}")
+            logger.debug("Raw Replicate result", extra={"result_type": type(result).__name__})
             
             # Handle the result properly
             if result:
@@ -94,7 +102,7 @@ class ReplicateImageGenerator:
                 if image_url.startswith('http'):
                     design_id = f"replicate_{uuid.uuid4().hex[:8]}"
                     
-                    print(f"✅ Image generated successfully: {image_url}")
+                    logger.info("Image generated", extra={"provider": "replicate", "design_id": design_id, "image_url": image_url})
                     
                     return {
                         "success": True,
@@ -105,14 +113,14 @@ class ReplicateImageGenerator:
                         "prompt_used": prompt
                     }
                 else:
-                    print(f"⚠️ Invalid URL format: {image_url}")
+                    logger.warning("Invalid Replicate output URL, using demo image", extra={"image_url": image_url[:100]})
                     return await self._create_demo_image(product_data)
             else:
-                print("❌ No output from Replicate")
+                logger.warning("No output from Replicate, using demo image")
                 return await self._create_demo_image(product_data)
                 
         except Exception as e:
-            print(f"❌ Replicate API error: {str(e)}")
+            logger.warning("Replicate API error, using demo image", extra={"error": str(e)})
             return await self._create_demo_image(product_data)
     
     async def _save_binary_image(self, binary_data: str, product_data: Dict[str, Any]) -> str:
@@ -152,7 +160,7 @@ class ReplicateImageGenerator:
             return f"/static/designs/{filename}"
             
         except Exception as e:
-            print(f"❌ Failed to save binary image: {str(e)}")
+            logger.error("Failed to save binary image", extra={"error": str(e)})
             return await self._create_demo_image(product_data)
     
     async def _create_demo_image(self, product_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -181,7 +189,8 @@ class ReplicateImageGenerator:
             
             # Draw package shape - more sophisticated design
             # Background gradient effect
-            for i in range(100):
+            # Concentric outlines stop at the centre, where x1 would drop below x0
+            for i in range(52):
                 shade = int(240 - i * 0.5)
                 draw.rectangle([i*10, i*10, 1024-i*10, 1024-i*10], 
                              outline=f'rgb({shade},{shade},{shade})')
@@ -235,7 +244,7 @@ class ReplicateImageGenerator:
             }
             
         except Exception as e:
-            print(f"Demo image creation failed: {str(e)}")
+            logger.error("Demo image creation failed, using SVG fallback", extra={"error": str(e)})
             return await self._create_fallback_svg(product_data)
     
     async def _create_fallback_svg(self, product_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -0,0 +1,104 @@
+"""
+Concept and Advice Rule Tables for PKL
+Loaded once from a versioned JSON file (app/data/rules.json) and compiled
+into dict lookups, with product keywords indexed so matching costs one
+lookup per word of input no matter how many rules the table holds.
+Advice wording lives in the per-language templates (see advice.py).
+"""
+
+import json
+import logging
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_VERSIONS = (2,)
+
+WORD = re.compile(r"[a-z0-9]+")
+
+
+def words(text: str) -> List[str]:
+    return WORD.findall(text.lower())
+
+
+def _phrases(text: str) -> Iterable[str]:
+    """Single words and adjacent pairs, so two-word keywords ("sweet potato") match too"""
+    tokens = words(text)
+    yield from tokens
+    for first, second in zip(tokens, tokens[1:]):
+        yield f"{first} {second}"
+
+
+class RuleTable:
+    """Read-only after construction; share one instance across requests"""
+
+    def __init__(self, data: Dict[str, Any]):
+        version = data.get("version")
+        if version not in SUPPORTED_VERSIONS:
+            raise ValueError(f"Unsupported rules version: {version}")
+        self.version = version
+
+        defaults = data["defaults"]
+        concepts = data["concepts"]
+        self.default_emotion = defaults["emotion"]
+        self.default_platform = defaults["platform"]
+        self.emotions: Dict[str, Dict[str, List[str]]] = concepts["emotions"]
+        self.platform_styles: Dict[str, List[str]] = concepts["platforms"]
+        self.keywords: List[str] = concepts["keywords"]
+        self.layouts: List[str] = concepts["layouts"]
+        self.fallback: Dict[str, List[str]] = data["fallback"]
+
+        # keyword -> (priority, fields it applies to, rule id); earlier rules win
+        self._product_index: Dict[str, Tuple[int, frozenset, str]] = {}
+        for priority, rule in enumerate(data["advice"]["products"]):
+            entry = (priority, frozenset(rule["fields"]), rule["id"])
+            for keyword in rule["keywords"]:
+                self._product_index.setdefault(" ".join(words(keyword)), entry)
+
+    def concepts_for(self, product_name: str, emotion: str, platform: str) -> Dict[str, List[str]]:
+        """Concept names, styles, colors, keywords and layouts for a product"""
+        by_emotion = self.emotions.get(emotion) or self.emotions[self.default_emotion]
+        styles = self.platform_styles.get(platform) or self.platform_styles[self.default_platform]
+        return {
+            "concepts": [template.format(product_name=product_name) for template in by_emotion["concepts"]],
+            "styles": list(styles),
+            "colors": list(by_emotion["colors"]),
+            "emotions": [emotion.title(), *self.keywords],
+            "layouts": list(self.layouts)
+        }
+
+    def fallback_concepts(self, product_name: str) -> Dict[str, List[str]]:
+        return {
+            "text_concepts": [template.format(product_name=product_name) for template in self.fallback["concepts"]],
+            "style_suggestions": list(self.fallback["styles"]),
+            "color_palette": list(self.fallback["colors"]),
+            "emotional_keywords": list(self.fallback["keywords"]),
+            "layout_suggestions": list(self.fallback["layouts"])
+        }
+
+    def product_rule(self, fields: Dict[str, str]) -> Optional[str]:
+        """Id of the highest-priority product rule whose keyword appears in its fields"""
+        best = None
+        for field, text in fields.items():
+            for phrase in _phrases(text or ""):
+                entry = self._product_index.get(phrase)
+                if entry is not None and field in entry[1] and (best is None or entry[0] < best[0]):
+                    best = entry
+        return best[2] if best else None
+
+
+def load_rules(path: str) -> RuleTable:
+    with open(path, "r", encoding="utf-8") as f:
+        table = RuleTable(json.load(f))
+    logger.info("Rule table loaded", extra={"path": path, "version": table.version, "product_keywords": len(table._product_index)})
+    return table
+
+
+@lru_cache(maxsize=1)
+def get_rules() -> RuleTable:
+    """The process-wide rule table, loaded on first use"""
+    return load_rules(settings.RULES_FILE)
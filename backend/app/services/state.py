@@ -0,0 +1,90 @@
+"""
+Shared State Service for PKL
+Cache and job state that must be visible to every worker process
+"""
+
+import json
+import time
+from typing import Any, Dict, Optional, Tuple
+
+
+class MemoryStateBackend:
+    """In-process state for development and single-worker runs"""
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[Any, Optional[float]]] = {}
+
+    def _live(self, key: str) -> bool:
+        entry = self._data.get(key)
+        if entry is None:
+            return False
+        _, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return False
+        return True
+
+    async def get(self, key: str) -> Optional[Any]:
+        return self._data[key][0] if self._live(key) else None
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        expires_at = time.monotonic() + ttl if ttl else None
+        self._data[key] = (value, expires_at)
+
+    async def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    async def incr(self, key: str, amount: int = 1) -> int:
+        value = (await self.get(key) or 0) + amount
+        expires_at = self._data[key][1] if self._live(key) else None
+        self._data[key] = (value, expires_at)
+        return value
+
+    async def check_health(self) -> bool:
+        return True
+
+    async def close(self) -> None:
+        self._data.clear()
+
+
+class RedisStateBackend:
+    """State shared across processes and nodes via any Redis-compatible server"""
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+
+        self.client = redis.from_url(url, decode_responses=True)
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self.client.get(key)
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        await self.client.set(key, json.dumps(value), ex=ttl)
+
+    async def delete(self, key: str) -> None:
+        await self.client.delete(key)
+
+    async def incr(self, key: str, amount: int = 1) -> int:
+        return await self.client.incrby(key, amount)
+
+    async def check_health(self) -> bool:
+        try:
+            return bool(await self.client.ping())
+        except Exception:
+            return False
+
+    async def close(self) -> None:
+        await self.client.close()
+
+
+def create_state_backend(url: str):
+    """
+    Build the state backend for a URL.
+    memory:// keeps state in-process; redis:// (or rediss://) shares it.
+    """
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisStateBackend(url)
+    if url.startswith("memory://") or not url:
+        return MemoryStateBackend()
+    raise ValueError(f"Unsupported state backend URL: {url}")
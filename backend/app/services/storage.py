@@ -3,21 +3,122 @@ Storage Service for PKL
 Handles file uploads, cloud storage, and design management
 """
 
+import logging
 import os
 import uuid
 import json
-import aiofiles
-from typing import Optional, Dict, Any
-from fastapi import UploadFile
+import asyncio
+import hashlib
+import mimetypes
+import shutil
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 from app.config import settings
+from app.metrics import publish_storage_stats
+from app.services import layout
+from app.services.fileio import WriteBatcher, fsync_paths, read_json, write_temp
+from app.services.object_store import create_object_store, put_many
+
+logger = logging.getLogger(__name__)
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines run a single worker
+    fcntl = None
+
+@contextmanager
+def file_lock(path: str, blocking: bool = True):
+    """
+    Exclusive lock across worker processes, held on a sidecar .lock file.
+    With blocking=False, raises BlockingIOError if another process holds it.
+    """
+    with open(f"{path}.lock", "a") as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def write_json_atomic(path: str, data: Any):
+    """Write JSON via a temp file and rename so readers never see a partial file"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+@lru_cache(maxsize=4096)
+def _hash_file(path: str, mtime_ns: int, size: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+def content_hash(path: str) -> str:
+    """
+    Short sha256 of a file's bytes, cached per (path, mtime, size) so
+    artifacts are hashed once per process unless they are rewritten
+    """
+    stat_result = os.stat(path)
+    return _hash_file(path, stat_result.st_mtime_ns, stat_result.st_size)
+
+STATS_COUNTERS = ("total_uploads", "total_designs", "total_files", "total_bytes")
+
+def dir_usage(directory: str, seen: Optional[set] = None):
+    """
+    (file count, total bytes) below a directory. Hard links to the same
+    blob count their bytes once; pass `seen` to dedupe across directories.
+    """
+    seen = set() if seen is None else seen
+    files, size = 0, 0
+    for dirpath, dirnames, filenames in os.walk(directory):
+        for filename in filenames:
+            if filename.startswith("."):
+                continue
+            try:
+                stat_result = os.stat(os.path.join(dirpath, filename))
+            except OSError:
+                continue
+            files += 1
+            inode = (stat_result.st_dev, stat_result.st_ino)
+            if inode not in seen:
+                seen.add(inode)
+                size += stat_result.st_size
+    return files, size
 
 class StorageService:
-    def __init__(self):
-        self.upload_dir = "storage/uploads"
-        self.designs_dir = "storage/designs"
-        self.mockups_dir = "storage/mockups"
+    def __init__(self, objects=None):
+        self.root = layout.STORAGE_ROOT
+        self.upload_dir = layout.UPLOADS_DIR
+        self.designs_dir = layout.DESIGNS_DIR
+        self.mockups_dir = layout.MOCKUPS_DIR
         self.metadata_file = "storage/design_metadata.json"
+        self.stats_file = "storage/storage_stats.json"
+        
+        # Uploads, mockups and reports are hard links into one sha256-named copy
+        from app.services.blobs import BlobStore
+        self.blobs = BlobStore("storage/blobs")
+        
+        # Local disk by default; an S3-compatible bucket shares artifacts across nodes
+        self.objects = objects or create_object_store(
+            settings.OBJECT_STORE_URL,
+            default_bucket=settings.CLOUD_STORAGE_BUCKET,
+            multipart_mb=settings.OBJECT_STORE_MULTIPART_MB,
+            concurrency=settings.OBJECT_STORE_CONCURRENCY,
+            public_endpoint_url=settings.OBJECT_STORE_PUBLIC_ENDPOINT or None
+        )
+        
+        # Small writes are coalesced: metadata updates and stats deltas share
+        # one locked read-modify-write, fsyncs share one executor hop
+        self.metadata_writes = WriteBatcher(self._apply_metadata, settings.STORAGE_WRITE_BATCH_WINDOW)
+        self.stats_writes = WriteBatcher(self._apply_stats, settings.STORAGE_WRITE_BATCH_WINDOW)
+        self.fsyncs = WriteBatcher(fsync_paths, settings.STORAGE_WRITE_BATCH_WINDOW)
+        self._health: Optional[tuple] = None
         
         # Create directories if they don't exist
         self._ensure_directories()
@@ -27,101 +128,185 @@ class StorageService:
         for directory in [self.upload_dir, self.designs_dir, self.mockups_dir]:
             os.makedirs(directory, exist_ok=True)
         
-        # Create metadata file if it doesn't exist
-        if not os.path.exists(self.metadata_file):
-            with open(self.metadata_file, 'w') as f:
-                json.dump({}, f)
+        # Create metadata file if it doesn't exist (workers may race here)
+        with file_lock(self.metadata_file):
+            if not os.path.exists(self.metadata_file):
+                write_json_atomic(self.metadata_file, {})
+    
+    def _apply_metadata(self, updates: list):
+        """Apply a batch of (key, value) updates in one locked read-modify-write"""
+        with file_lock(self.metadata_file):
+            metadata = read_json(self.metadata_file, {})
+            for key, value in updates:
+                metadata[key] = value
+            write_json_atomic(self.metadata_file, metadata)
+            if settings.STORAGE_FSYNC:
+                fsync_paths([self.metadata_file])
+    
+    async def durable(self, file_path: str):
+        """Wait until file_path (and its rename) is on disk, sharing fsyncs with concurrent writers"""
+        if settings.STORAGE_FSYNC:
+            await self.fsyncs.submit(file_path)
+    
+    def _probe_disk(self) -> bool:
+        """Writable and not nearly full; statvfs and access(), no writes"""
+        usage = shutil.disk_usage(self.root)
+        return os.access(self.root, os.W_OK) and usage.free >= settings.STORAGE_MIN_FREE_MB * 1024 * 1024
     
     async def check_health(self) -> bool:
-        """Check if storage system is accessible"""
+        """Check if storage system is accessible (cached for STORAGE_HEALTH_TTL seconds)"""
+        now = time.monotonic()
+        if self._health and now - self._health[0] < settings.STORAGE_HEALTH_TTL:
+            return self._health[1]
+        
         try:
-            # Test write access
-            test_file = f"{self.upload_dir}/health_check.txt"
-            async with aiofiles.open(test_file, 'w') as f:
-                await f.write("health check")
-            
-            # Clean up test file
-            if os.path.exists(test_file):
-                os.remove(test_file)
-            
+            healthy = self._probe_disk() and await self.objects.check_health()
+        except Exception:
+            healthy = False
+        self._health = (now, healthy)
+        return healthy
+    
+    async def close(self):
+        """Flush batched writes and close the object store"""
+        for batcher in (self.metadata_writes, self.stats_writes, self.fsyncs):
+            await batcher.close()
+        await self.objects.close()
+    
+    def object_key(self, file_path: str) -> Optional[str]:
+        """Object key for a path under storage/, e.g. designs/<id>/mockup.jpg"""
+        relative = os.path.relpath(file_path, self.root)
+        if relative.startswith("..") or os.path.isabs(relative):
+            return None
+        return relative.replace(os.sep, "/")
+    
+    async def publish(self, file_path: str) -> Optional[str]:
+        """Copy a local artifact to a remote object store; returns its key"""
+        key = self.object_key(file_path)
+        if key is None or not self.objects.remote:
+            return None
+        content_type, _ = mimetypes.guess_type(file_path)
+        await self.objects.put_file(key, file_path, content_type)
+        return key
+    
+    async def ensure_local(self, file_path: str) -> bool:
+        """Fetch an artifact written by another node into the local cache"""
+        if os.path.exists(file_path):
             return True
-        except:
+        key = self.object_key(file_path)
+        if key is None or not self.objects.remote or not await self.objects.exists(key):
             return False
+        await self.objects.get_file(key, file_path)
+        return True
+    
+    async def remote_url(self, file_path: str) -> Optional[str]:
+        """Presigned download URL for an artifact held only in the object store"""
+        key = self.object_key(file_path)
+        if key is None or not self.objects.remote or not await self.objects.exists(key):
+            return None
+        return await self.objects.presigned_url(key, expires=settings.OBJECT_STORE_URL_EXPIRES)
     
-    async def save_upload(self, file: UploadFile, design_id: str) -> str:
+    async def save_upload(self, data: bytes, design_id: str, ext: str = ".jpg") -> str:
         """
-        Save uploaded file to storage
+        Save a (normalized) uploaded image to storage
         Returns the file path
         """
-        # Generate unique filename
-        file_extension = os.path.splitext(file.filename)[1]
-        filename = f"{design_id}_original{file_extension}"
-        file_path = os.path.join(self.upload_dir, filename)
+        # Sharded by design id: uploads/ab/cd/<design_id>_original.<ext>
+        file_path = layout.upload_path(design_id, ext, self.upload_dir)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        
+        # One executor hop: write a temp file, then link it into the blob store
+        loop = asyncio.get_event_loop()
+        deltas = await loop.run_in_executor(
+            None,
+            lambda: self._adopt(file_path, write_temp(file_path, data))
+        )
+        await self._record_stats(**deltas)
+        await self.durable(file_path)
         
-        # Save file
-        async with aiofiles.open(file_path, 'wb') as f:
-            content = await file.read()
-            await f.write(content)
+        # Other nodes may handle the regenerate call for this design
+        await self.publish(file_path)
         
         return file_path
     
     async def get_public_url(self, file_path: str) -> str:
         """
-        Generate public URL for file
-        In production, this would generate signed URLs for cloud storage
+        Generate public URL for file, versioned with its content hash (?v=)
+        so it can be cached as immutable.
+        With a remote object store the file is uploaded and a presigned
+        URL returned, so downloads bypass the API entirely.
         """
-        # Get base URL from environment or use default
-        base_url = "https://promptagrow.onrender.com"
+        if await self.publish(file_path):
+            return await self.objects.presigned_url(self.object_key(file_path), expires=settings.OBJECT_STORE_URL_EXPIRES)
         
+        base_url = settings.PUBLIC_BASE_URL.rstrip("/")
+        
+        # Design artifacts go through the range-capable download endpoint
+        design_file = layout.design_of(file_path, self.designs_dir)
+        if design_file:
+            url = f"{base_url}/api/designs/{design_file[0]}/files/{design_file[1]}"
         # Convert local path to URL path
-        if file_path.startswith("storage/"):
-            return f"{base_url}/static/{file_path}"
+        elif file_path.startswith("storage/"):
+            url = f"{base_url}/static/{file_path}"
         elif file_path.startswith("static/"):
-            return f"{base_url}/{file_path}"
+            url = f"{base_url}/{file_path}"
         else:
-            return f"{base_url}/static/{os.path.basename(file_path)}"
+            url = f"{base_url}/static/{os.path.basename(file_path)}"
+        
+        try:
+            loop = asyncio.get_event_loop()
+            version = await loop.run_in_executor(None, lambda: content_hash(file_path))
+        except OSError:
+            return url
+        return f"{url}?v={version}"
+    
+    async def get_public_urls(self, file_paths: List[str]) -> List[str]:
+        """
+        get_public_url for several artifacts of one design; with a remote
+        object store they are uploaded in parallel before signing
+        """
+        keys = [self.object_key(file_path) for file_path in file_paths]
+        if not self.objects.remote or None in keys:
+            return [await self.get_public_url(file_path) for file_path in file_paths]
+        
+        await put_many(
+            self.objects,
+            [(key, file_path, mimetypes.guess_type(file_path)[0]) for key, file_path in zip(keys, file_paths)],
+            settings.OBJECT_STORE_CONCURRENCY
+        )
+        return [
+            await self.objects.presigned_url(key, expires=settings.OBJECT_STORE_URL_EXPIRES)
+            for key in keys
+        ]
     
     async def design_exists(self, design_id: str) -> bool:
         """Check if design exists in storage"""
-        design_dir = os.path.join(self.designs_dir, design_id)
-        return os.path.exists(design_dir)
+        return os.path.exists(layout.design_dir(design_id, self.designs_dir))
     
     async def save_design_metadata(self, design_data: Dict[str, Any]) -> bool:
         """Save design metadata to storage"""
         try:
-            # Load existing metadata
-            async with aiofiles.open(self.metadata_file, 'r') as f:
-                content = await f.read()
-                metadata = json.loads(content) if content else {}
-            
-            # Add new design
-            metadata[design_data["savedDesignId"]] = design_data
-            
-            # Save updated metadata
-            async with aiofiles.open(self.metadata_file, 'w') as f:
-                await f.write(json.dumps(metadata, indent=2))
+            # Batched with concurrent saves into one locked update off the event loop
+            await self.metadata_writes.submit((design_data["savedDesignId"], design_data))
             
             return True
         except Exception as e:
-            print(f"Metadata save error: {e}")
+            logger.error("Metadata save failed", extra={"error": str(e)})
             return False
     
     async def get_design_metadata(self, design_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve design metadata"""
         try:
-            async with aiofiles.open(self.metadata_file, 'r') as f:
-                content = await f.read()
-                metadata = json.loads(content) if content else {}
-                return metadata.get(design_id)
+            loop = asyncio.get_event_loop()
+            metadata = await loop.run_in_executor(None, lambda: read_json(self.metadata_file, {}))
+            return metadata.get(design_id)
         except:
             return None
     
     async def list_user_designs(self, user_email: str) -> list:
         """List all designs for a user"""
         try:
-            async with aiofiles.open(self.metadata_file, 'r') as f:
-                content = await f.read()
-                metadata = json.loads(content) if content else {}
+            loop = asyncio.get_event_loop()
+            metadata = await loop.run_in_executor(None, lambda: read_json(self.metadata_file, {}))
             
             user_designs = []
             for design_id, data in metadata.items():
@@ -136,7 +321,7 @@ class StorageService:
     
     async def create_design_directory(self, design_id: str) -> str:
         """Create directory for design files"""
-        design_dir = os.path.join(self.designs_dir, design_id)
+        design_dir = layout.design_dir(design_id, self.designs_dir)
         os.makedirs(design_dir, exist_ok=True)
         return design_dir
     
@@ -145,54 +330,148 @@ class StorageService:
         design_dir = await self.create_design_directory(design_id)
         mockup_path = os.path.join(design_dir, "mockup.jpg")
         
-        async with aiofiles.open(mockup_path, 'wb') as f:
-            await f.write(mockup_data)
-        
+        # One executor hop: write a temp file and link it into the blob store
+        loop = asyncio.get_event_loop()
+        deltas = await loop.run_in_executor(
+            None,
+            lambda: self._adopt(mockup_path, write_temp(mockup_path, mockup_data))
+        )
+        await self._record_stats(**deltas)
+        await self.durable(mockup_path)
         return mockup_path
     
-    async def cleanup_old_files(self, days: int = 30):
-        """Clean up files older than specified days"""
-        cutoff_time = datetime.now().timestamp() - (days * 24 * 60 * 60)
+    async def cleanup_old_files(self, days: int = 30) -> Dict[str, Any]:
+        """Clean up unsaved designs and uploads older than specified days"""
+        from app.services.gc import StorageGC
         
-        for directory in [self.upload_dir, self.designs_dir, self.mockups_dir]:
-            for filename in os.listdir(directory):
-                file_path = os.path.join(directory, filename)
-                if os.path.getmtime(file_path) < cutoff_time:
-                    try:
-                        if os.path.isfile(file_path):
-                            os.remove(file_path)
-                        elif os.path.isdir(file_path):
-                            import shutil
-                            shutil.rmtree(file_path)
-                    except Exception as e:
-                        print(f"Cleanup error: {e}")
+        return await StorageGC(self).run(retention_days=days)
     
-    async def get_storage_stats(self) -> Dict[str, Any]:
-        """Get storage usage statistics"""
-        stats = {
-            "total_uploads": 0,
-            "total_designs": 0,
-            "storage_used_mb": 0
-        }
+    # Storage statistics: counters adjusted on every write/delete made through
+    # this service and persisted in storage_stats.json, so reading them never
+    # touches the tree. reconcile_stats() rescans periodically to correct drift
+    # from files written elsewhere (report renderers, generators, manual edits).
+    
+    def _read_stats(self) -> Dict[str, Any]:
+        return read_json(self.stats_file, {})
+    
+    def _adjust_stats(self, deltas: Dict[str, int]) -> Dict[str, Any]:
+        with file_lock(self.stats_file):
+            stats = self._read_stats()
+            for name, delta in deltas.items():
+                stats[name] = max(0, stats.get(name, 0) + delta)
+            stats["updatedAt"] = datetime.utcnow().isoformat()
+            write_json_atomic(self.stats_file, stats)
+        return stats
+    
+    def _apply_stats(self, batch: list) -> Dict[str, Any]:
+        """Sum a batch of deltas into one counter update"""
+        totals: Dict[str, int] = {}
+        for deltas in batch:
+            for name, delta in deltas.items():
+                totals[name] = totals.get(name, 0) + delta
+        stats = self._adjust_stats(totals)
+        publish_storage_stats(stats)
+        return stats
+    
+    async def _record_stats(self, **deltas: int):
+        """Queue counter deltas; they land with the next batch (fire and forget)"""
+        if any(deltas.values()):
+            await self.stats_writes.submit(deltas, wait=False)
+    
+    def _adopt(self, file_path: str, src_path: str) -> Dict[str, int]:
+        is_new_file = not os.path.exists(file_path) or src_path == file_path
+        is_new_design = layout.design_of(file_path, self.designs_dir) is not None and self._claim_design(os.path.dirname(file_path))
         
+        digest, byte_delta = self.blobs.store(src_path, file_path)
+        deltas = {"total_bytes": byte_delta}
+        if is_new_file:
+            deltas["total_files"] = 1
+            if os.path.abspath(file_path).startswith(os.path.abspath(self.upload_dir) + os.sep):
+                deltas["total_uploads"] = 1
+        if is_new_design:
+            deltas["total_designs"] = 1
+        return deltas
+    
+    def _claim_design(self, design_dir: str) -> bool:
+        """True exactly once per design folder, whichever writer gets there first"""
         try:
-            # Count uploads
-            stats["total_uploads"] = len(os.listdir(self.upload_dir))
-            
-            # Count designs
-            stats["total_designs"] = len(os.listdir(self.designs_dir))
-            
-            # Calculate storage usage
-            total_size = 0
-            for directory in [self.upload_dir, self.designs_dir, self.mockups_dir]:
-                for dirpath, dirnames, filenames in os.walk(directory):
-                    for filename in filenames:
-                        file_path = os.path.join(dirpath, filename)
-                        total_size += os.path.getsize(file_path)
-            
-            stats["storage_used_mb"] = round(total_size / (1024 * 1024), 2)
-            
-        except Exception as e:
-            print(f"Stats calculation error: {e}")
-        
+            os.close(os.open(os.path.join(design_dir, ".counted"), os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            return False
+    
+    async def adopt(self, file_path: str, src_path: Optional[str] = None):
+        """
+        Move a file into the content-addressed blob store and leave file_path
+        as a link to it, counting it in the storage stats. src_path is a temp
+        file to move into place; omit it for files written in place by code
+        outside this service (reports, generator downloads).
+        """
+        if self.object_key(file_path) is None or not os.path.isfile(src_path or file_path):
+            return
+        try:
+            loop = asyncio.get_event_loop()
+            deltas = await loop.run_in_executor(None, lambda: self._adopt(file_path, src_path or file_path))
+        except OSError as e:
+            logger.warning("Blob store failed", extra={"path": file_path, "error": str(e)})
+            return
+        await self._record_stats(**deltas)
+    
+    def _scan_stats(self) -> Dict[str, int]:
+        """Full walk of the storage tree; only used for reconciliation"""
+        files, size, seen = 0, 0, set()
+        for directory in [self.upload_dir, self.designs_dir, self.mockups_dir]:
+            directory_files, directory_size = dir_usage(directory, seen)
+            files += directory_files
+            size += directory_size
+        # Blobs no longer linked from anywhere still occupy disk
+        size += dir_usage(self.blobs.root, seen)[1]
+        return {
+            "total_uploads": sum(1 for _ in layout.iter_uploads(self.upload_dir)),
+            "total_designs": sum(1 for _ in layout.iter_design_dirs(self.designs_dir)),
+            "total_files": files,
+            "total_bytes": size
+        }
+    
+    def _reconcile_stats(self, max_age: Optional[float] = None) -> Dict[str, Any]:
+        with file_lock(self.stats_file):
+            previous = self._read_stats()
+            if max_age is not None and "reconciledAt" in previous:
+                age = (datetime.utcnow() - datetime.fromisoformat(previous["reconciledAt"])).total_seconds()
+                if age < max_age:
+                    # Another worker rescanned recently
+                    return previous
+            scanned = self._scan_stats()
+            drift = {name: scanned[name] - previous.get(name, 0) for name in STATS_COUNTERS}
+            now = datetime.utcnow().isoformat()
+            stats = {**scanned, "updatedAt": now, "reconciledAt": now}
+            write_json_atomic(self.stats_file, stats)
+        if any(drift.values()):
+            logger.info("Storage stats reconciled", extra={"drift": drift})
+        return stats
+    
+    async def reconcile_stats(self, max_age: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Recount the tree off the event loop and replace the counters,
+        unless a reconciliation newer than max_age seconds already exists
+        """
+        loop = asyncio.get_event_loop()
+        stats = await loop.run_in_executor(None, lambda: self._reconcile_stats(max_age))
+        publish_storage_stats(stats)
         return stats
+    
+    async def get_storage_stats(self) -> Dict[str, Any]:
+        """Get storage usage statistics from the persisted counters"""
+        loop = asyncio.get_event_loop()
+        stats = await loop.run_in_executor(None, self._read_stats)
+        if "reconciledAt" not in stats:
+            stats = await self.reconcile_stats()
+        
+        return {
+            "total_uploads": stats.get("total_uploads", 0),
+            "total_designs": stats.get("total_designs", 0),
+            "total_files": stats.get("total_files", 0),
+            "storage_used_mb": round(stats.get("total_bytes", 0) / (1024 * 1024), 2),
+            "updated_at": stats.get("updatedAt"),
+            "reconciled_at": stats.get("reconciledAt")
+        }
@@ -0,0 +1,66 @@
+"""
+Static file serving for PKL Backend
+Strong content-hash ETags, conditional GET and Cache-Control for
+sample assets and generated artifacts
+"""
+
+import asyncio
+import os
+
+from starlette.datastructures import Headers, QueryParams
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+from app.config import settings
+from app.services.storage import content_hash
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header (list or *) against an ETag"""
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    StaticFiles with a sha256-based strong ETag. URLs carrying the current
+    content hash (?v=, as built by StorageService.get_public_url) are served
+    as immutable; other URLs get a short max-age and revalidate via 304.
+    """
+
+    def file_response(
+        self,
+        full_path: os.PathLike,
+        stat_result: os.stat_result,
+        scope,
+        status_code: int = 200,
+    ) -> Response:
+        # Validators are added in get_response, where hashing can leave the loop
+        return FileResponse(full_path, status_code=status_code, stat_result=stat_result, method=scope["method"])
+
+    async def get_response(self, path: str, scope) -> Response:
+        response = await super().get_response(path, scope)
+        if not isinstance(response, FileResponse):
+            return response
+
+        # Usually already cached: get_public_url hashed it when building the URL
+        loop = asyncio.get_event_loop()
+        version = await loop.run_in_executor(None, lambda: content_hash(str(response.path)))
+        response.headers["etag"] = f'"{version}"'
+        if QueryParams(scope["query_string"]).get("v") == version:
+            response.headers["cache-control"] = IMMUTABLE
+        else:
+            response.headers["cache-control"] = f"public, max-age={settings.STATIC_MAX_AGE}"
+
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    def is_not_modified(self, response_headers: Headers, request_headers: Headers) -> bool:
+        """If-None-Match (lists and * included) wins over If-Modified-Since"""
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is None:
+            return super().is_not_modified(response_headers, request_headers)
+        return etag_matches(if_none_match, response_headers["etag"])
@@ -3,15 +3,18 @@ Utility functions for PromptAgro backend
 File validation, PDF generation, image processing
 """
 
+import logging
 import os
-import magic
+import time
 from typing import Dict, Any
 from fastapi import UploadFile
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from reportlab.lib.utils import ImageReader
-from PIL import Image
-import io
+
+from app.services import layout
+
+logger = logging.getLogger(__name__)
+
+# ReportLab and Pillow are imported inside the functions that use them so
+# importing this module stays cheap
 
 # Supported image formats
 ALLOWED_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp'}
@@ -48,9 +51,12 @@ async def create_pdf_report(
     Create PDF report with design details
     Returns path to generated PDF
     """
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+    
     try:
         pdf_filename = f"design_report_{design_id}.pdf"
-        pdf_path = f"storage/designs/{design_id}/{pdf_filename}"
+        pdf_path = layout.design_file(design_id, pdf_filename)
         
         # Ensure directory exists
         os.makedirs(os.path.dirname(pdf_path), exist_ok=True)
@@ -113,7 +119,7 @@ async def create_pdf_report(
         return pdf_path
     
     except Exception as e:
-        print(f"PDF generation error: {e}")
+        logger.error("PDF generation failed", extra={"design_id": design_id}, exc_info=True)
         # Return sample PDF path
         return "static/sample-design.pdf"
 
@@ -122,6 +128,8 @@ def resize_image(image_path: str, max_width: int = 800, max_height: int = 600) -
     Resize image to specified dimensions
     Returns path to resized image
     """
+    from PIL import Image
+    
     try:
         with Image.open(image_path) as img:
             # Calculate new dimensions
@@ -134,13 +142,15 @@ def resize_image(image_path: str, max_width: int = 800, max_height: int = 600) -
             return resized_path
     
     except Exception as e:
-        print(f"Image resize error: {e}")
+        logger.warning("Image resize failed", extra={"image_path": image_path, "error": str(e)})
         return image_path
 
 def get_image_info(image_path: str) -> Dict[str, Any]:
     """
     Get image information (dimensions, format, size)
     """
+    from PIL import Image
+    
     try:
         with Image.open(image_path) as img:
             return {
@@ -158,6 +168,8 @@ def create_thumbnail(image_path: str, size: tuple = (150, 150)) -> str:
     Create thumbnail of image
     Returns path to thumbnail
     """
+    from PIL import Image
+    
     try:
         with Image.open(image_path) as img:
             img.thumbnail(size, Image.Resampling.LANCZOS)
@@ -168,7 +180,7 @@ def create_thumbnail(image_path: str, size: tuple = (150, 150)) -> str:
             return thumbnail_path
     
     except Exception as e:
-        print(f"Thumbnail creation error: {e}")
+        logger.warning("Thumbnail creation failed", extra={"image_path": image_path, "error": str(e)})
         return image_path
 
 def generate_design_filename(product_name: str, design_type: str = "mockup") -> str:
@@ -200,5 +212,3 @@ def sanitize_filename(filename: str) -> str:
         name, ext = os.path.splitext(filename)
         filename = name[:90] + ext
     return filename
-
-import time
@@ -3,10 +3,15 @@ Simplified utility functions for PromptAgro backend
 File validation and basic operations
 """
 
+import logging
 import os
 import time
 from typing import Dict, Any
 
+from app.services import layout
+
+logger = logging.getLogger(__name__)
+
 # Supported image formats
 ALLOWED_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp'}
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
@@ -45,7 +50,7 @@ async def create_pdf_report(
     """
     try:
         report_filename = f"design_report_{design_id}.txt"
-        report_path = f"storage/designs/{design_id}/{report_filename}"
+        report_path = layout.design_file(design_id, report_filename)
         
         # Ensure directory exists
         os.makedirs(os.path.dirname(report_path), exist_ok=True)
@@ -78,7 +83,7 @@ Generated by PromptAgro • Visit promptagro.com
         return report_path
     
     except Exception as e:
-        print(f"Report generation error: {e}")
+        logger.error("Report generation failed", extra={"design_id": design_id}, exc_info=True)
         return "static/sample-design.txt"
 
 def generate_design_filename(product_name: str, design_type: str = "mockup") -> str:
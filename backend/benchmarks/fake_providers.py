@@ -0,0 +1,144 @@
+"""
+Local stand-in for the external image providers
+Simulates DeepAI, Replicate, Gemini and the HF Space with configurable latency and
+failure distributions so load tests never touch (or pay for) real APIs.
+
+Each provider's latency is log-normal around a median; a fraction of calls
+fail with 5xx/429. Profiles come from FAKE_PROVIDER_PROFILE (JSON, merged
+over the defaults) and FAKE_LATENCY_SCALE shrinks every delay for quick runs.
+
+    uvicorn fake_providers:app --app-dir benchmarks --port 9100
+"""
+
+import asyncio
+import base64
+import io
+import json
+import math
+import os
+import random
+import uuid
+
+from fastapi import FastAPI, Form, HTTPException, Request
+from fastapi.responses import JSONResponse, Response
+
+DEFAULT_PROFILES = {
+    "deepai": {"median_ms": 2500, "sigma": 0.5, "failure_rate": 0.03},
+    "download": {"median_ms": 300, "sigma": 0.4, "failure_rate": 0.01},
+    "replicate": {"median_ms": 4000, "sigma": 0.6, "failure_rate": 0.02},
+    "hf_space": {"median_ms": 6000, "sigma": 0.7, "failure_rate": 0.05},
+    "gemini": {"median_ms": 1500, "sigma": 0.5, "failure_rate": 0.02}
+}
+
+PROFILES = {name: dict(profile) for name, profile in DEFAULT_PROFILES.items()}
+for name, overrides in json.loads(os.getenv("FAKE_PROVIDER_PROFILE", "{}")).items():
+    PROFILES.setdefault(name, {}).update(overrides)
+
+LATENCY_SCALE = float(os.getenv("FAKE_LATENCY_SCALE", "1.0"))
+
+app = FastAPI(title="PromptAgro Fake Providers")
+
+predictions = {}
+
+
+def _sample_image() -> bytes:
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (512, 512), color="#2E7D32").save(buffer, format="JPEG", quality=80)
+    return buffer.getvalue()
+
+
+SAMPLE_JPEG = _sample_image()
+
+
+async def simulate(provider: str):
+    """Sleep for a log-normal latency, then maybe fail like the real API does"""
+    profile = PROFILES[provider]
+    delay_ms = profile["median_ms"] * math.exp(random.gauss(0, profile["sigma"]))
+    await asyncio.sleep(delay_ms * LATENCY_SCALE / 1000)
+
+    if random.random() < profile["failure_rate"]:
+        status = random.choice([429, 500, 502, 503])
+        raise HTTPException(status_code=status, detail=f"Simulated {provider} failure")
+
+
+@app.get("/")
+async def root():
+    return {"status": "alive", "profiles": PROFILES, "latency_scale": LATENCY_SCALE}
+
+
+# DeepAI text2img
+@app.post("/api/text2img")
+async def deepai_text2img(request: Request, text: str = Form(...)):
+    await simulate("deepai")
+    image_id = uuid.uuid4().hex
+    return {"id": image_id, "output_url": f"{str(request.base_url).rstrip('/')}/images/{image_id}.jpg"}
+
+
+@app.get("/images/{image_id}.jpg")
+async def download_image(image_id: str):
+    await simulate("download")
+    return Response(content=SAMPLE_JPEG, media_type="image/jpeg")
+
+
+# Replicate predictions API (official-model route used by client.run)
+@app.post("/v1/models/{owner}/{name}/predictions")
+async def replicate_create_prediction(owner: str, name: str, request: Request):
+    await simulate("replicate")
+    prediction_id = uuid.uuid4().hex
+    base = str(request.base_url).rstrip("/")
+    prediction = {
+        "id": prediction_id,
+        "model": f"{owner}/{name}",
+        "version": "fake",
+        "status": "succeeded",
+        "input": (await request.json()).get("input", {}),
+        "output": [f"{base}/images/{prediction_id}.jpg"],
+        "error": None,
+        "logs": "",
+        "urls": {"get": f"{base}/v1/predictions/{prediction_id}", "cancel": f"{base}/v1/predictions/{prediction_id}/cancel"}
+    }
+    predictions[prediction_id] = prediction
+    return JSONResponse(prediction, status_code=201)
+
+
+@app.get("/v1/predictions/{prediction_id}")
+async def replicate_get_prediction(prediction_id: str):
+    if prediction_id not in predictions:
+        raise HTTPException(status_code=404, detail="Prediction not found")
+    return predictions[prediction_id]
+
+
+# HF Space image generator
+@app.post("/generate-packaging/")
+async def hf_space_generate(
+    product_name: str = Form(...),
+    quality: str = Form("final")
+):
+    await simulate("hf_space")
+    return {
+        "success": True,
+        "image_data": f"data:image/jpeg;base64,{base64.b64encode(SAMPLE_JPEG).decode()}",
+        "product_name": product_name,
+        "generator": "Fake HF Space",
+        "cost": "FREE",
+        "quality": quality
+    }
+
+
+# Gemini generateContent with a JSON response schema (concept generation)
+@app.post("/v1beta/models/{model}:generateContent")
+async def gemini_generate_content(model: str, request: Request):
+    body = await request.json()
+    prompt = body["contents"][0]["parts"][0]["text"]
+    await simulate("gemini")
+    products = max(prompt.count("=== PRODUCT "), 1)
+    concept_sets = [{
+        "text_concepts": [f"Fake Concept {i + 1}" for i in range(3)],
+        "style_suggestions": ["Rustic Artisan", "Modern Premium", "Clean Natural"],
+        "color_palette": ["#2E7D32", "#8BC34A", "#FFC107", "#795548"],
+        "emotional_keywords": ["Trust", "Quality", "Natural", "Fresh"],
+        "layout_suggestions": ["Typography Focus", "Image Dominant", "Balanced Composition"]
+    } for _ in range(products)]
+    return {"candidates": [{"content": {"role": "model", "parts": [{"text": json.dumps(concept_sets)}]}}]}
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Load test for PKL Backend
+Starts the fake provider server and the FastAPI app (in a scratch working
+directory so storage/ stays clean), drives the main endpoints at a fixed
+concurrency and reports throughput, latency percentiles and the backend's
+memory high-water mark as JSON for comparison between releases.
+
+    cd backend
+    pip install -r benchmarks/requirements.txt
+    python benchmarks/load_test.py --concurrency 16 --requests 200 --output load.json
+    python benchmarks/load_test.py --latency-scale 0.05 --scenarios generate,save-design
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+
+SCENARIOS = ["generate", "generate-replicate", "generate-batch", "save-design", "regenerate"]
+
+# Products per generate-batch request; every fifth repeats so concepts are shared
+BATCH_SIZE = 20
+
+
+def sample_upload() -> bytes:
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (800, 600), color="#8BC34A").save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+
+def start_process(args, cwd, env, log_path):
+    log = open(log_path, "w")
+    return subprocess.Popen(args, cwd=cwd, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+
+async def wait_healthy(url: str, timeout: float = 30.0):
+    started = time.monotonic()
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() - started < timeout:
+            try:
+                if (await client.get(url, timeout=1)).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.05)
+    raise RuntimeError(f"{url} did not become healthy within {timeout}s")
+
+
+def peak_rss_mb(pid: int) -> float:
+    """Peak resident set size of a process (Linux VmHWM, psutil elsewhere)"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss / (1024 * 1024)
+    except Exception:
+        return 0.0
+
+
+def percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def summarize(latencies_ms, statuses, wall_seconds):
+    errors = sum(1 for status in statuses if status >= 400 or status == 0)
+    return {
+        "requests": len(statuses),
+        "errors": errors,
+        "error_rate": round(errors / len(statuses), 4) if statuses else 0,
+        "throughput_rps": round(len(statuses) / wall_seconds, 2) if wall_seconds else 0,
+        "latency_ms": {
+            "p50": round(percentile(latencies_ms, 50), 1),
+            "p95": round(percentile(latencies_ms, 95), 1),
+            "p99": round(percentile(latencies_ms, 99), 1),
+            "mean": round(statistics.fmean(latencies_ms), 1) if latencies_ms else 0,
+            "max": round(max(latencies_ms), 1) if latencies_ms else 0
+        }
+    }
+
+
+class LoadDriver:
+    def __init__(self, base_url: str, concurrency: int, timeout: float):
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.upload = sample_upload()
+        self.design_ids = []
+
+    def build_request(self, scenario: str, index: int):
+        """(method, path, request kwargs) for one call of a scenario"""
+        product = {
+            "productName": f"Load Test Honey {index}",
+            "tagline": "Pure & Natural",
+            "preferredColors": json.dumps(["yellow", "brown"]),
+            "salesPlatform": "local-market",
+            "desiredEmotion": "trust"
+        }
+        if scenario == "generate":
+            return "POST", "/api/generate", {
+                "data": {**product, "productStory": "Harvested by our co-op", "language": "en"},
+                "files": {"image": ("product.jpg", self.upload, "image/jpeg")}
+            }
+        if scenario == "generate-replicate":
+            return "POST", "/api/generate-replicate", {"data": product}
+        if scenario == "generate-batch":
+            return "POST", "/api/generate/batch", {"json": {"products": [
+                {**product, "productName": f"Load Test Honey {index}-{item % (BATCH_SIZE - BATCH_SIZE // 5)}"}
+                for item in range(BATCH_SIZE)
+            ]}}
+        if scenario == "save-design":
+            return "POST", "/api/save-design", {"json": {
+                "designId": f"design_load{index:04d}",
+                "userEmail": f"farmer{index % 50}@example.com",
+                "designName": f"Load Test Design {index}"
+            }}
+        if scenario == "regenerate":
+            design_id = self.design_ids[index % len(self.design_ids)] if self.design_ids else "design_missing"
+            return "POST", "/api/regenerate", {"json": {
+                "designId": design_id,
+                "customizations": {"colors": ["#2E7D32"], "style_preferences": {"style": "Modern"}}
+            }}
+        raise ValueError(f"Unknown scenario: {scenario}")
+
+    async def run_scenario(self, scenario: str, total: int):
+        latencies_ms, statuses = [], []
+        counter = iter(range(total))
+
+        async def worker(client: httpx.AsyncClient):
+            for index in counter:
+                method, path, kwargs = self.build_request(scenario, index)
+                started = time.perf_counter()
+                try:
+                    response = await client.request(method, path, **kwargs)
+                    status = response.status_code
+                    if scenario == "generate" and status == 200:
+                        data = response.json().get("data") or {}
+                        if data.get("designId") and not data.get("adviceMode"):
+                            self.design_ids.append(data["designId"])
+                except httpx.HTTPError:
+                    status = 0
+                latencies_ms.append((time.perf_counter() - started) * 1000)
+                statuses.append(status)
+
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout, limits=limits) as client:
+            started = time.perf_counter()
+            await asyncio.gather(*(worker(client) for _ in range(self.concurrency)))
+            wall_seconds = time.perf_counter() - started
+
+        return summarize(latencies_ms, statuses, wall_seconds)
+
+
+async def run(args):
+    workdir = tempfile.mkdtemp(prefix="pkl-load-")
+    fake_url = f"http://127.0.0.1:{args.fake_port}"
+    backend_url = f"http://127.0.0.1:{args.port}"
+
+    fake_env = dict(os.environ, FAKE_LATENCY_SCALE=str(args.latency_scale))
+    if args.profile:
+        fake_env["FAKE_PROVIDER_PROFILE"] = args.profile
+
+    backend_env = dict(
+        os.environ,
+        PYTHONPATH=BACKEND_DIR,
+        DEEPAI_API_KEY="fake-deepai-key",
+        DEEPAI_API_URL=f"{fake_url}/api/text2img",
+        REPLICATE_API_TOKEN="fake-replicate-token",
+        REPLICATE_API_BASE_URL=fake_url,
+        GEMINI_API_KEY="fake-gemini-key",
+        GEMINI_API_URL=f"{fake_url}/v1beta",
+        STATE_BACKEND_URL="memory://",
+        LOG_LEVEL="WARNING"
+    )
+
+    fake = start_process(
+        [sys.executable, "-m", "uvicorn", "fake_providers:app", "--app-dir", BENCH_DIR,
+         "--port", str(args.fake_port), "--log-level", "warning"],
+        workdir, fake_env, os.path.join(workdir, "fake_providers.log")
+    )
+    backend = start_process(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port), "--log-level", "warning"],
+        workdir, backend_env, os.path.join(workdir, "backend.log")
+    )
+
+    try:
+        await wait_healthy(f"{fake_url}/")
+        await wait_healthy(f"{backend_url}/health")
+
+        driver = LoadDriver(backend_url, args.concurrency, args.timeout)
+        results = {}
+        for scenario in args.scenarios:
+            results[scenario] = await driver.run_scenario(scenario, args.requests)
+            print(f"{scenario:>20}: {results[scenario]['throughput_rps']} req/s, "
+                  f"p50 {results[scenario]['latency_ms']['p50']} ms, "
+                  f"p99 {results[scenario]['latency_ms']['p99']} ms, "
+                  f"errors {results[scenario]['errors']}", file=sys.stderr)
+
+        return {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "config": {
+                "concurrency": args.concurrency,
+                "requests_per_scenario": args.requests,
+                "latency_scale": args.latency_scale,
+                "profile_overrides": json.loads(args.profile) if args.profile else {}
+            },
+            "scenarios": results,
+            "memory": {"backend_peak_rss_mb": round(peak_rss_mb(backend.pid), 1)},
+            "logs": workdir
+        }
+    finally:
+        for process in (backend, fake):
+            process.terminate()
+            process.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the backend against fake providers")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=100, help="Requests per scenario")
+    parser.add_argument("--scenarios", type=lambda s: s.split(","), default=SCENARIOS,
+                        help=f"Comma-separated subset of {','.join(SCENARIOS)}")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Multiply all simulated provider latency")
+    parser.add_argument("--profile", help='JSON provider overrides, e.g. \'{"deepai": {"failure_rate": 0.2}}\'')
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--fake-port", type=int, default=9100)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    report = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
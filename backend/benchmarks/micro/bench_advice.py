@@ -0,0 +1,51 @@
+"""
+Text advice used in advice mode and alongside SVG fallbacks
+"""
+
+import json
+
+from app.config import settings
+from app.services.advice import advice_key, render_advice
+from app.services.rules import RuleTable, get_rules
+from app.services.text_advisor import create_concept_summary, create_smart_packaging_advice
+
+
+def bench_smart_packaging_advice(benchmark, product_data):
+    advice = benchmark(create_smart_packaging_advice, product_data)
+    assert "Kilimo Wildflower Honey" in advice
+
+
+def bench_smart_packaging_advice_uncached(benchmark, product_data):
+    # Template rendering cost without the LRU in front of it
+    key = advice_key(dict(product_data, language="sw"))
+    advice = benchmark(render_advice.__wrapped__, key)
+    assert "Kilimo Wildflower Honey" in advice
+
+
+def bench_smart_packaging_advice_json_colors(benchmark, product_data):
+    # The advisor also receives colors as the raw JSON form field
+    product_data = dict(product_data, preferredColors='["yellow", "brown"]')
+    benchmark(create_smart_packaging_advice, product_data)
+
+
+def bench_concept_summary(benchmark, product_data):
+    summary = benchmark(create_concept_summary, product_data)
+    assert len(summary) == 4
+
+
+def bench_concepts_from_rules(benchmark):
+    concepts = benchmark(get_rules().concepts_for, "Kilimo Wildflower Honey", "trust", "local-market")
+    assert len(concepts["concepts"]) == 3
+
+
+def bench_product_advice_large_table(benchmark):
+    # Lookup cost must not grow with the number of product rules
+    with open(settings.RULES_FILE, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    data["advice"]["products"] += [
+        {"id": f"crop{i}", "keywords": [f"crop{i}"], "fields": ["productName"]}
+        for i in range(5000)
+    ]
+    rules = RuleTable(data)
+    rule = benchmark(rules.product_rule, {"productName": "Kilimo Wildflower Honey", "tagline": "Pure & Natural"})
+    assert rule == "honey"
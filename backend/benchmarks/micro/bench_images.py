@@ -0,0 +1,33 @@
+"""
+Upload normalization, image resizing and thumbnails
+"""
+
+from app.utils import create_thumbnail, resize_image
+
+
+def bench_resize_image(benchmark, upload_image):
+    path = benchmark(resize_image, upload_image)
+    assert path == "upload_resized.jpg"
+
+
+def bench_create_thumbnail(benchmark, upload_image):
+    path = benchmark(create_thumbnail, upload_image)
+    assert path == "upload_thumb.jpg"
+
+
+def bench_normalize_upload(benchmark, upload_image):
+    from app.services.images import normalize_image
+
+    with open(upload_image, "rb") as f:
+        data = f.read()
+    image = benchmark(normalize_image, data)
+    assert max(image.width, image.height) <= 1024 and image.format == "JPEG"
+
+
+def bench_normalize_upload_mpo(benchmark, upload_mpo):
+    from app.services.images import normalize_image
+
+    with open(upload_mpo, "rb") as f:
+        data = f.read()
+    image = benchmark(normalize_image, data)
+    assert max(image.width, image.height) <= 1024 and image.format == "JPEG"
@@ -0,0 +1,38 @@
+"""
+Demo image and SVG fallback renderers used when providers are unavailable
+"""
+
+import pytest
+
+from app.services.deepai_generator import DeepAIImageGenerator
+from app.services.replicate_generator import ReplicateImageGenerator
+
+
+@pytest.fixture(scope="module")
+def deepai():
+    return DeepAIImageGenerator("")
+
+
+@pytest.fixture(scope="module")
+def replicate():
+    return ReplicateImageGenerator("")
+
+
+def bench_deepai_demo_image(benchmark, run, deepai, product_data):
+    result = benchmark(lambda: run(lambda: deepai._create_demo_image(product_data)))
+    assert result["image_url"].startswith("data:image/png")
+
+
+def bench_replicate_demo_image(benchmark, run, replicate, product_data):
+    result = benchmark(lambda: run(lambda: replicate._create_demo_image(product_data)))
+    assert result["image_url"].startswith("data:image/png")
+
+
+def bench_deepai_fallback_svg(benchmark, run, deepai, product_data):
+    result = benchmark(lambda: run(lambda: deepai._create_fallback_svg(product_data)))
+    assert result["image_url"].startswith("data:image/svg+xml")
+
+
+def bench_replicate_fallback_svg(benchmark, run, replicate, product_data):
+    result = benchmark(lambda: run(lambda: replicate._create_fallback_svg(product_data)))
+    assert result["image_url"].startswith("data:image/svg+xml")
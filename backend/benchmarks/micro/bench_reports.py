@@ -0,0 +1,15 @@
+"""
+Design report renderers
+"""
+
+from app import utils, utils_simple
+
+
+def bench_pdf_report(benchmark, run, workdir, mockup_data, concepts, product_data):
+    path = benchmark(lambda: run(lambda: utils.create_pdf_report("design_bench", mockup_data, concepts, product_data)))
+    assert path.endswith(".pdf")
+
+
+def bench_text_report(benchmark, run, workdir, mockup_data, concepts, product_data):
+    path = benchmark(lambda: run(lambda: utils_simple.create_pdf_report("design_bench", mockup_data, concepts, product_data)))
+    assert path.endswith(".txt")
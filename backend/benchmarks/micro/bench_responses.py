@@ -0,0 +1,88 @@
+"""
+Response serialization and compression
+Typical /api/generate payloads: advice mode (text heavy) and image mode
+with an inline base64 fallback image. Wire sizes land in extra_info.
+"""
+
+import base64
+import gzip
+import io
+import json
+
+import pytest
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from app.compression import brotli, compress
+
+
+@pytest.fixture
+def advice_payload(product_data, concepts):
+    from app.services.text_advisor import create_concept_summary, create_smart_packaging_advice
+
+    return {
+        "success": True,
+        "data": {
+            "designId": "advice_bench",
+            "adviceMode": True,
+            "professionalAdvice": create_smart_packaging_advice(product_data),
+            "conceptSummary": create_concept_summary(product_data),
+            "nextSteps": ["Share this advice with a local designer", "Print a test label", "Collect buyer feedback"],
+            "concepts": concepts["text_concepts"],
+            "stylesSuggestions": concepts["style_suggestions"],
+            "colorPalette": concepts["color_palette"],
+            "processingTime": 0.0123,
+            "stageTimings": {"upload_save": 0.002, "concepts": 0.004, "provider_call": 0.006},
+            "aiConfidence": 0.95
+        }
+    }
+
+
+@pytest.fixture
+def image_payload(concepts):
+    from PIL import Image, ImageDraw
+
+    image = Image.new("RGB", (512, 512), color="#2E7D32")
+    draw = ImageDraw.Draw(image)
+    for y in range(0, 512, 16):
+        draw.line([(0, y), (511, 511 - y)], fill="#FFC107", width=3)
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+
+    return {
+        "success": True,
+        "data": {
+            "designId": "fallback_bench",
+            "mockupUrl": f"data:image/png;base64,{base64.b64encode(buffer.getvalue()).decode()}",
+            "concepts": concepts["text_concepts"],
+            "stylesSuggestions": concepts["style_suggestions"],
+            "colorPalette": concepts["color_palette"],
+            "processingTime": 2.5,
+            "aiConfidence": 0.85
+        }
+    }
+
+
+@pytest.mark.parametrize("mode", ["advice", "image"])
+@pytest.mark.parametrize("response_class", [JSONResponse, ORJSONResponse], ids=["json", "orjson"])
+def bench_serialize(benchmark, request, mode, response_class):
+    payload = request.getfixturevalue(f"{mode}_payload")
+    body = benchmark(response_class(payload).render, payload)
+    assert json.loads(body) == json.loads(json.dumps(payload))
+
+
+@pytest.mark.parametrize("mode", ["advice", "image"])
+@pytest.mark.parametrize("encoding", ["gzip", "br"])
+def bench_compress(benchmark, request, mode, encoding):
+    if encoding == "br" and brotli is None:
+        pytest.skip("brotli not installed")
+
+    body = ORJSONResponse(request.getfixturevalue(f"{mode}_payload")).body
+    compressed = benchmark(compress, body, encoding)
+
+    benchmark.extra_info.update({
+        "identity_bytes": len(body),
+        "compressed_bytes": len(compressed),
+        "ratio": round(len(compressed) / len(body), 3)
+    })
+    if encoding == "gzip":
+        assert gzip.decompress(compressed) == body
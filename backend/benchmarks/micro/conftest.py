@@ -0,0 +1,112 @@
+"""
+Shared fixtures for the micro-benchmarks
+Representative inputs matching what /api/generate passes per request
+"""
+
+import asyncio
+import glob
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, BACKEND_DIR)
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".baselines")
+
+
+# Regression allowed against the baseline before a run fails
+COMPARE_FAIL = "mean:15%"
+
+
+def pytest_configure(config):
+    """
+    Compare against the latest saved baseline. Save runs record one and are
+    not compared; without a baseline a plain run refuses to pass as a gate.
+    """
+    if config.getoption("benchmark_save", None) or config.getoption("benchmark_autosave", False):
+        return
+    if config.getoption("benchmark_disable", False):
+        return
+    if not glob.glob(os.path.join(BASELINE_DIR, "*", "*.json")):
+        pytest.exit(
+            "No benchmark baseline in .baselines/. Record one on the reference machine first:\n"
+            "    pytest --benchmark-save=baseline",
+            returncode=4
+        )
+
+    from pytest_benchmark.utils import parse_compare_fail
+
+    if not config.option.benchmark_compare:
+        config.option.benchmark_compare = True
+    if not config.option.benchmark_compare_fail:
+        config.option.benchmark_compare_fail = [parse_compare_fail(COMPARE_FAIL)]
+
+
+@pytest.fixture
+def product_data():
+    return {
+        "productName": "Kilimo Wildflower Honey",
+        "tagline": "Raw, organic and locally harvested",
+        "colors": ["yellow", "brown", "green"],
+        "preferredColors": ["yellow", "brown", "green"],
+        "desiredEmotion": "trust",
+        "salesPlatform": "farmers-market",
+        "productStory": "Our co-operative of 40 beekeepers harvests honey from acacia and wildflower meadows"
+    }
+
+
+@pytest.fixture
+def concepts():
+    return {
+        "text_concepts": [
+            "Premium Kilimo Wildflower Honey - Trusted Quality",
+            "Farm-Fresh Kilimo Wildflower Honey - Nature's Best",
+            "Authentic Kilimo Wildflower Honey - Heritage Crafted"
+        ],
+        "style_suggestions": ["Rustic Artisan", "Traditional Heritage", "Community Crafted"],
+        "color_palette": ["#2E7D32", "#8BC34A", "#FFC107", "#795548"],
+        "emotional_keywords": ["Trust", "Quality", "Natural", "Fresh"]
+    }
+
+
+@pytest.fixture
+def mockup_data():
+    return {"image_path": "storage/designs/design_bench/mockup.jpg", "processing_time": 3.21}
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Run inside a scratch directory; the helpers write relative to cwd"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def upload_image(workdir):
+    """A phone-camera-sized product photo"""
+    from PIL import Image
+
+    path = "upload.jpg"
+    Image.new("RGB", (1600, 1200), color="#8BC34A").save(path, format="JPEG", quality=90)
+    return path
+
+
+@pytest.fixture
+def upload_mpo(workdir):
+    """The same photo as a 2-frame MPO, as most phone cameras write it"""
+    from PIL import Image
+
+    path = "upload_mpo.jpg"
+    frames = [Image.new("RGB", (1600, 1200), color=color) for color in ("#8BC34A", "#795548")]
+    frames[0].save(path, format="MPO", save_all=True, append_images=frames[1:], quality=90)
+    return path
+
+
+@pytest.fixture
+def run():
+    """Run a coroutine factory to completion on a reused event loop"""
+    loop = asyncio.new_event_loop()
+    yield lambda make_coro: loop.run_until_complete(make_coro())
+    loop.close()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for PKL Backend
+Measures the import-time breakdown of app.main (python -X importtime) and the
+cold start of a real server process until /health answers, and fails when
+either exceeds its budget.
+
+    cd backend
+    python benchmarks/startup.py                     # report + budget check
+    python benchmarks/startup.py --top 30 --json startup.json
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Budgets for an autoscaled instance joining during a traffic spike
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "600"))
+COLD_START_TARGET_MS = float(os.getenv("COLD_START_TARGET_MS", "2500"))
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure_imports(module: str = "app.main"):
+    """Run a fresh interpreter with -X importtime and parse its breakdown"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append({
+                "module": name,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+                "depth": (len(indent) - 1) // 2
+            })
+
+    # Top-level entries (depth 0) add up to the whole import
+    total_ms = sum(e["cumulative_ms"] for e in entries if e["depth"] == 0)
+    return total_ms, entries
+
+
+def measure_cold_start(port: int, timeout: float = 30.0) -> float:
+    """Start uvicorn in a new process and time until /health responds"""
+    started = time.monotonic()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR
+    )
+    try:
+        while time.monotonic() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return (time.monotonic() - started) * 1000
+            except OSError:
+                time.sleep(0.02)
+        raise RuntimeError(f"Server did not become healthy within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backend import and cold-start benchmark")
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules to show")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--skip-server", action="store_true", help="Only measure imports")
+    parser.add_argument("--json", dest="json_path", help="Write results as JSON")
+    args = parser.parse_args()
+
+    total_ms, entries = measure_imports()
+    slowest = sorted(entries, key=lambda e: e["cumulative_ms"], reverse=True)[:args.top]
+
+    print(f"import app.main: {total_ms:.1f} ms (budget {IMPORT_BUDGET_MS:.0f} ms)")
+    print(f"{'cumulative':>12} {'self':>10}  module")
+    for entry in slowest:
+        print(f"{entry['cumulative_ms']:>10.1f}ms {entry['self_ms']:>8.1f}ms  {entry['module']}")
+
+    results = {
+        "import_ms": round(total_ms, 1),
+        "import_budget_ms": IMPORT_BUDGET_MS,
+        "slowest_imports": slowest
+    }
+
+    failed = total_ms > IMPORT_BUDGET_MS
+
+    if not args.skip_server:
+        cold_start_ms = measure_cold_start(args.port)
+        print(f"cold start to /health: {cold_start_ms:.1f} ms (target {COLD_START_TARGET_MS:.0f} ms)")
+        results.update(cold_start_ms=round(cold_start_ms, 1), cold_start_target_ms=COLD_START_TARGET_MS)
+        failed = failed or cold_start_ms > COLD_START_TARGET_MS
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
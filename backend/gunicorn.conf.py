@@ -0,0 +1,43 @@
+"""
+Gunicorn configuration for PKL Backend
+Runs N uvicorn workers sized from the node's CPU count
+"""
+
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Requests are mostly I/O waits on providers, so a couple of workers per
+# core keeps the CPU busy; WEB_CONCURRENCY overrides, MAX_WORKERS caps it
+cpu_count = multiprocessing.cpu_count()
+workers = int(os.getenv("WEB_CONCURRENCY", min(cpu_count * 2 + 1, int(os.getenv("MAX_WORKERS", "8")))))
+
+timeout = int(os.getenv("WORKER_TIMEOUT", "120"))
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+keepalive = 5
+
+# Recycle workers periodically to bound memory growth from image work
+max_requests = int(os.getenv("MAX_REQUESTS", "1000"))
+max_requests_jitter = 100
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info")
+
+
+def on_starting(server):
+    """Start each boot with an empty Prometheus multiprocess directory"""
+    metrics_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if metrics_dir:
+        os.makedirs(metrics_dir, exist_ok=True)
+        for name in os.listdir(metrics_dir):
+            os.remove(os.path.join(metrics_dir, name))
+
+
+def child_exit(server, worker):
+    """Drop a dead worker's Prometheus samples in multiprocess mode"""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
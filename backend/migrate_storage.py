@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Move flat storage/ trees into the sharded layout
+    storage/designs/<id>/           -> storage/designs/ab/cd/<id>/
+    storage/uploads/<id>_original.* -> storage/uploads/ab/cd/<id>_original.*
+
+Renames stay on one filesystem, so they are atomic and keep blob hard links
+intact. Safe to re-run; already-sharded entries are left alone. Stop the
+backend (or accept a few 404s) while it runs, then let the next stats
+reconciliation pick up the new tree.
+
+    cd backend
+    python migrate_storage.py --dry-run
+    python migrate_storage.py
+"""
+
+import argparse
+import os
+import sys
+
+from app.services import layout
+
+
+def plan(designs_dir: str, uploads_dir: str):
+    """(source, destination) for every entry still in the flat layout"""
+    moves = []
+    if os.path.isdir(designs_dir):
+        for entry in os.scandir(designs_dir):
+            if entry.is_dir() and not layout.is_shard_name(entry.name):
+                moves.append((entry.path, layout.design_dir(entry.name, designs_dir)))
+    if os.path.isdir(uploads_dir):
+        for entry in os.scandir(uploads_dir):
+            if entry.is_file() and "_original" in entry.name and not entry.name.endswith(".tmp"):
+                design_id = entry.name.split("_original")[0]
+                moves.append((entry.path, os.path.join(uploads_dir, layout.shard(design_id), entry.name)))
+    return moves
+
+
+def migrate(moves, dry_run: bool = False) -> int:
+    failed = 0
+    for source, destination in moves:
+        if os.path.exists(destination):
+            print(f"skip (exists): {source} -> {destination}", file=sys.stderr)
+            failed += 1
+            continue
+        print(f"{source} -> {destination}")
+        if dry_run:
+            continue
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        os.rename(source, destination)
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate storage/ to the sharded layout")
+    parser.add_argument("--designs-dir", default=layout.DESIGNS_DIR)
+    parser.add_argument("--uploads-dir", default=layout.UPLOADS_DIR)
+    parser.add_argument("--dry-run", action="store_true", help="Print the moves without making them")
+    args = parser.parse_args()
+
+    moves = plan(args.designs_dir, args.uploads_dir)
+    failed = migrate(moves, args.dry_run)
+    print(f"{len(moves) - failed} of {len(moves)} entries {'would move' if args.dry_run else 'moved'}", file=sys.stderr)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -28,6 +28,10 @@ class HuggingFaceAPI {
             formData.append('colors', (productData.preferredColors || ['green']).join(','));
             formData.append('emotion', productData.desiredEmotion || 'trust');
             formData.append('platform', productData.salesPlatform || 'farmers-market');
+            formData.append('quality', productData.quality || 'final'); // 'draft' for quick previews
+            if (productData.model) {
+                formData.append('model', productData.model); // registry model name, defaults server-side
+            }
             
             const response = await fetch(`${this.baseURL}/generate-packaging/`, {
                 method: 'POST',
@@ -51,6 +55,8 @@ class HuggingFaceAPI {
                         cost: result.cost,
                         processingTime: result.processing_time,
                         promptUsed: result.prompt_used,
+                        quality: result.quality,
+                        model: result.model,
                         // Add some mock data for compatibility
                         concepts: [
                             `Premium ${productData.productName} - AI Generated`,
@@ -83,6 +89,7 @@ class HuggingFaceAPI {
             formData.append('height', options.height || 768);
             formData.append('num_inference_steps', options.steps || 6);
             formData.append('guidance_scale', options.guidance || 1.5);
+            formData.append('quality', options.quality || 'final');
             
             const response = await fetch(`${this.baseURL}/generate/`, {
                 method: 'POST',
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Build pre-serialized model snapshots for the PromptAgro Image Generator
+Run once at image build time; the server then memory-maps the snapshot at
+boot instead of re-parsing hub files and converting weights.
+
+    python build_snapshot.py                   # every declared model
+    python build_snapshot.py lcm-sd15 --dtype float16
+"""
+
+import argparse
+import os
+import sys
+
+import torch
+
+from model_registry import ModelRegistry
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build memory-mappable model snapshots")
+    parser.add_argument("models", nargs="*", help="Registry model names (default: all declared)")
+    parser.add_argument(
+        "--config",
+        default=os.environ.get("MODEL_REGISTRY_CONFIG", "models.json"),
+        help="Model registry config"
+    )
+    parser.add_argument(
+        "--dtype",
+        choices=["float32", "float16"],
+        help="Target dtype (default: float16 on GPU nodes, float32 on CPU)"
+    )
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.config)
+    if args.dtype:
+        registry.torch_dtype = getattr(torch, args.dtype)
+
+    names = args.models or list(registry.models)
+    failed = False
+    for name in names:
+        try:
+            registry.resolve(name)
+            path = registry.build_snapshot(name)
+            print(f"📦 Snapshot for {name} written to {path}")
+        except KeyError:
+            print(f"❌ Unknown model: {name}")
+            failed = True
+        except Exception as e:
+            print(f"❌ Snapshot for {name} failed: {e}")
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
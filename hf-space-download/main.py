@@ -3,6 +3,7 @@ import os
 # Disable xformers to avoid Windows compatibility issues (MUST be before diffusers import)
 os.environ["DISABLE_XFORMERS"] = "1"
 os.environ["_DIFFUSERS_DISABLE_XFORMERS"] = "1"
+os.environ["XFORMERS_DISABLED"] = "1"
 
 # Set cache directory to a writable location
 os.environ["HF_HOME"] = "/tmp/huggingface_cache"
@@ -12,13 +13,15 @@ os.environ["HF_HUB_CACHE"] = "/tmp/huggingface_cache"
 from fastapi import FastAPI, Form, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, FileResponse
-from diffusers import StableDiffusionPipeline
+from typing import Optional
 import torch
 import uuid
 import base64
 import io
 from PIL import Image
 
+from model_registry import ModelRegistry, CACHE_DIR
+
 # Initialize FastAPI app
 app = FastAPI(title="PromptAgro Image Generator API")
 
@@ -31,105 +34,164 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global variable for the pipeline
-pipe = None
-model_loading = False
+# Registry of declared models; pipelines are loaded lazily per request
+MODEL_REGISTRY_CONFIG = os.environ.get(
+    "MODEL_REGISTRY_CONFIG",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "models.json")
+)
+registry = ModelRegistry(MODEL_REGISTRY_CONFIG)
 
-def load_model_if_needed():
-    """Load model lazily when first request arrives"""
-    global pipe, model_loading
-    
-    if pipe is not None:
-        return True
+# VAE swapping for quality tiers: the full VAE decodes "final" renders, a
+# distilled tiny autoencoder (TAESD) decodes quick "draft" previews
+tiny_vae = None
+TINY_VAE_ID = os.environ.get("TINY_VAE_ID", "madebyollin/taesd")
+
+QUALITY_PRESETS = {
+    "draft": {
+        "width": 512,
+        "height": 512,
+        "num_inference_steps": 4,
+        "guidance_scale": 1.0,
+        "vae": "tiny"
+    },
+    "final": {
+        "width": 768,
+        "height": 768,
+        "num_inference_steps": 6,
+        "guidance_scale": 1.5,
+        "vae": "full"
+    }
+}
+
+async def get_pipeline(model: Optional[str]):
+    """Resolve the requested model and load it lazily on first use"""
+    try:
+        model_name = registry.resolve(model)
+    except KeyError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown model '{model}'. Use one of: {', '.join(registry.models)}"
+        )
     
-    if model_loading:
-        return False  # Already loading, wait
+    # Concurrent requests for a model that is still loading get a 503
+    pipe = await registry.get(model_name)
+    if pipe is None:
+        if model_name in registry.loading:
+            raise HTTPException(status_code=503, detail="Model is loading, please wait...")
+        else:
+            raise HTTPException(status_code=503, detail="Model failed to load. Please check logs.")
     
-    model_loading = True
-    success = load_model()
-    model_loading = False
-    return success
+    return model_name, pipe
 
-def load_model():
-    """Load the Stable Diffusion model with proper error handling"""
-    global pipe
+def load_tiny_vae():
+    """Load the distilled tiny autoencoder used for draft previews"""
+    global tiny_vae
     
-    print("🚀 Loading Stable Diffusion Model...")
-    model_id = "rupeshs/LCM-runwayml-stable-diffusion-v1-5"
+    if tiny_vae is not None:
+        return True
     
     try:
-        # Create cache directory if it doesn't exist
-        os.makedirs("/tmp/huggingface_cache", exist_ok=True)
+        from diffusers import AutoencoderTiny
         
-        # Use appropriate dtype based on device
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        torch_dtype = torch.float16 if torch.cuda.is_available() else torch.float32
-        
-        print(f"📱 Device: {device}, dtype: {torch_dtype}")
-        
-        # Load the model with cache directory specified
-        pipe = StableDiffusionPipeline.from_pretrained(
-            model_id, 
-            torch_dtype=torch_dtype,
-            cache_dir="/tmp/huggingface_cache",
-            local_files_only=False
-        )
-        
-        pipe = pipe.to(device)
-        
-        # Skip XFormers on Windows - causes compatibility issues
-        # Enable memory efficient attention if available
-        # if hasattr(pipe, 'enable_xformers_memory_efficient_attention'):
-        #     try:
-        #         pipe.enable_xformers_memory_efficient_attention()
-        #         print("✅ XFormers memory efficient attention enabled")
-        #     except Exception:
-        #         print("⚠️ XFormers not available, using default attention")
-        
-        print("✅ Using default attention (Windows compatible)")
-        print(f"✅ Model Loaded successfully on {device}")
+        print(f"🚀 Loading tiny VAE: {TINY_VAE_ID}")
+        tiny_vae = AutoencoderTiny.from_pretrained(
+            TINY_VAE_ID,
+            torch_dtype=registry.torch_dtype,
+            cache_dir=CACHE_DIR
+        ).to(registry.device)
+        print("✅ Tiny VAE loaded")
         return True
         
     except Exception as e:
-        print(f"❌ Failed to load model: {e}")
-        pipe = None
+        print(f"⚠️ Failed to load tiny VAE, drafts will use the full VAE: {e}")
+        tiny_vae = None
         return False
 
-# Don't load model on startup - do it lazily
-# model_loaded = load_model()
+def apply_quality(pipe, model_name: str, quality: str) -> dict:
+    """
+    Select the decoder for the requested quality tier.
+    Returns the tier preset (with per-model overrides) plus the VAE actually used.
+    """
+    if quality not in QUALITY_PRESETS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown quality '{quality}'. Use one of: {', '.join(QUALITY_PRESETS)}"
+        )
+    
+    preset = dict(QUALITY_PRESETS[quality])
+    preset.update(registry.presets(model_name).get(quality, {}))
+    
+    # Generation runs synchronously on the event loop, so swapping the
+    # shared pipeline's VAE here cannot race with another request
+    if preset["vae"] == "tiny" and load_tiny_vae():
+        pipe.vae = tiny_vae
+    else:
+        pipe.vae = registry.full_vaes[model_name]
+        preset["vae"] = "full"
+    
+    return preset
+
+# Don't load models on startup - the registry loads them lazily
 
 @app.get("/")
 async def root():
     """Health check endpoint with enhanced status"""
+    model_loaded = registry.default_model in registry.loaded
+    model_loading = registry.default_model in registry.loading
     return {
         "status": "alive",
         "service": "PromptAgro Image Generator",
-        "model_loaded": pipe is not None,
+        "model_loaded": model_loaded,
         "model_loading": model_loading,
-        "device": "cuda" if torch.cuda.is_available() else "cpu",
-        "model_status": "loaded" if pipe is not None else ("loading" if model_loading else "not_loaded"),
+        "device": registry.device,
+        "model_status": "loaded" if model_loaded else ("loading" if model_loading else "not_loaded"),
         "torch_dtype": "float16" if torch.cuda.is_available() else "float32",
-        "ready_for_requests": pipe is not None
+        "ready_for_requests": model_loaded,
+        "quality_tiers": list(QUALITY_PRESETS),
+        "tiny_vae_loaded": tiny_vae is not None,
+        "models": registry.status()
     }
 
+@app.get("/models/")
+async def list_models():
+    """Declared models, which are loaded, and memory headroom"""
+    return registry.status()
+
+@app.post("/models/reload/")
+async def reload_models():
+    """Re-read models.json so models can be added or swapped without a restart"""
+    try:
+        registry.reload_config()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Invalid model config: {str(e)}")
+    return registry.status()
+
 @app.post("/generate/")
-async def generate_image(prompt: str = Form(...)):
+async def generate_image(
+    prompt: str = Form(...),
+    quality: str = Form("final"),
+    model: Optional[str] = Form(None)
+):
     """
     Generate product packaging image from input prompt.
     Returns image file directly (your original approach).
     """
-    # Lazy load model on first request
-    if not load_model_if_needed():
-        if model_loading:
-            raise HTTPException(status_code=503, detail="Model is loading, please wait...")
-        else:
-            raise HTTPException(status_code=503, detail="Model failed to load. Please check logs.")
+    # Lazy load the requested model on first use
+    model_name, pipe = await get_pipeline(model)
+    
+    preset = apply_quality(pipe, model_name, quality)
     
-    print(f"🖌️ Generating image for prompt: {prompt}")
+    print(f"🖌️ Generating {quality} image for prompt: {prompt}")
 
     try:
-        # Generate image (your original approach)
-        image = pipe(prompt).images[0]
+        # Generate image at the tier's resolution and step count
+        image = pipe(
+            prompt=prompt,
+            width=preset["width"],
+            height=preset["height"],
+            num_inference_steps=preset["num_inference_steps"],
+            guidance_scale=preset["guidance_scale"]
+        ).images[0]
 
         # Save image to temp file (your original approach)
         filename = f"/tmp/{uuid.uuid4().hex}.png"
@@ -138,7 +200,11 @@ async def generate_image(prompt: str = Form(...)):
         print(f"📦 Image saved to {filename}")
 
         # Return image file as response (your original approach)
-        return FileResponse(filename, media_type="image/png")
+        return FileResponse(
+            filename,
+            media_type="image/png",
+            headers={"X-Quality": quality, "X-VAE": preset["vae"], "X-Model": model_name}
+        )
     
     except Exception as e:
         print(f"❌ Image generation failed: {e}")
@@ -150,19 +216,26 @@ async def generate_image_json(
     width: int = Form(512),
     height: int = Form(512),
     num_inference_steps: int = Form(4),  # LCM works well with few steps
-    guidance_scale: float = Form(1.0)    # LCM uses low guidance
+    guidance_scale: float = Form(1.0),   # LCM uses low guidance
+    quality: str = Form("final"),
+    model: Optional[str] = Form(None)
 ):
     """
     Generate image and return as JSON with base64 data (for frontend integration).
     """
-    # Lazy load model on first request
-    if not load_model_if_needed():
-        if model_loading:
-            raise HTTPException(status_code=503, detail="Model is loading, please wait...")
-        else:
-            raise HTTPException(status_code=503, detail="Model failed to load. Please check logs.")
+    # Lazy load the requested model on first use
+    model_name, pipe = await get_pipeline(model)
     
-    print(f"🖌️ Generating image for prompt: {prompt}")
+    preset = apply_quality(pipe, model_name, quality)
+    
+    # Drafts never render above the draft resolution, step count or guidance
+    if quality == "draft":
+        width = min(width, preset["width"])
+        height = min(height, preset["height"])
+        num_inference_steps = min(num_inference_steps, preset["num_inference_steps"])
+        guidance_scale = min(guidance_scale, preset["guidance_scale"])
+    
+    print(f"🖌️ Generating {quality} image for prompt: {prompt}")
     
     try:
         # Generate image with parameters optimized for LCM
@@ -186,7 +259,10 @@ async def generate_image_json(
             "image_data": f"data:image/png;base64,{img_str}",
             "prompt_used": prompt,
             "dimensions": {"width": width, "height": height},
-            "steps": num_inference_steps
+            "steps": num_inference_steps,
+            "quality": quality,
+            "vae": preset["vae"],
+            "model": model_name
         })
         
     except Exception as e:
@@ -198,17 +274,17 @@ async def generate_packaging_specific(
     product_name: str = Form(...),
     colors: str = Form("green,yellow"),
     emotion: str = Form("trust"),
-    platform: str = Form("farmers-market")
+    platform: str = Form("farmers-market"),
+    quality: str = Form("final"),
+    model: Optional[str] = Form(None)
 ):
     """
-    Generate packaging with PromptAgro-specific prompt engineering
+    Generate packaging with PromptAgro-specific prompt engineering.
+    quality="draft" renders a fast low-resolution preview with the tiny VAE,
+    quality="final" renders full resolution with the full VAE.
     """
-    # Lazy load model on first request
-    if not load_model_if_needed():
-        if model_loading:
-            raise HTTPException(status_code=503, detail="Model is loading, please wait...")
-        else:
-            raise HTTPException(status_code=503, detail="Model failed to load. Please check logs.")
+    # Lazy load the requested model on first use
+    model_name, pipe = await get_pipeline(model)
     
     # Create professional prompt for agricultural packaging
     prompt = f"""Professional agricultural product packaging design for {product_name}, 
@@ -219,17 +295,19 @@ async def generate_packaging_specific(
     
     prompt = prompt.strip().replace('\n', ' ').replace('  ', ' ')
     
-    print(f"🎨 Generating packaging for: {product_name}")
+    preset = apply_quality(pipe, model_name, quality)
+    
+    print(f"🎨 Generating {quality} packaging for: {product_name}")
     print(f"📝 Using prompt: {prompt}")
     
     try:
-        # Generate with packaging-optimized settings
+        # Generate with packaging-optimized settings for the quality tier
         image = pipe(
             prompt=prompt,
-            width=768,
-            height=768,
-            num_inference_steps=6,
-            guidance_scale=1.5
+            width=preset["width"],
+            height=preset["height"],
+            num_inference_steps=preset["num_inference_steps"],
+            guidance_scale=preset["guidance_scale"]
         ).images[0]
         
         # Convert to base64
@@ -242,9 +320,13 @@ async def generate_packaging_specific(
             "image_data": f"data:image/png;base64,{img_str}",
             "prompt_used": prompt,
             "product_name": product_name,
-            "generator": "Stable Diffusion LCM",
+            "generator": registry.models[model_name].get("label", "Stable Diffusion"),
             "cost": "FREE",
-            "processing_time": "~3-5 seconds"
+            "processing_time": "~1-2 seconds" if quality == "draft" else "~3-5 seconds",
+            "quality": quality,
+            "vae": preset["vae"],
+            "model": model_name,
+            "dimensions": {"width": preset["width"], "height": preset["height"]}
         })
         
     except Exception as e:
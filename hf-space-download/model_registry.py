@@ -0,0 +1,280 @@
+"""
+Model registry for the PromptAgro Image Generator
+Models are declared in models.json, loaded on first use and kept in an
+LRU of loaded pipelines bounded by available memory
+"""
+
+import asyncio
+import gc
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import torch
+
+CACHE_DIR = "/tmp/huggingface_cache"
+
+# Pre-serialized pipelines written by build_snapshot.py
+SNAPSHOT_DIR = os.environ.get(
+    "SNAPSHOT_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "snapshots")
+)
+SNAPSHOT_MANIFEST = "snapshot.json"
+
+# Used when no models.json is shipped next to the server
+DEFAULT_CONFIG = {
+    "default": "lcm-sd15",
+    "max_loaded": 2,
+    "memory_reserve_mb": 1024,
+    "models": {
+        "lcm-sd15": {
+            "model_id": "rupeshs/LCM-runwayml-stable-diffusion-v1-5",
+            "label": "Stable Diffusion LCM",
+            "approx_memory_mb": 4200
+        }
+    }
+}
+
+
+def available_memory_mb(device: str) -> float:
+    """Free memory on the device models are loaded to"""
+    if device == "cuda":
+        free_bytes, _ = torch.cuda.mem_get_info()
+        return free_bytes / (1024 * 1024)
+
+    try:
+        import psutil
+        return psutil.virtual_memory().available / (1024 * 1024)
+    except ImportError:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def dtype_name(torch_dtype) -> str:
+    """Short dtype name for manifests, e.g. float16"""
+    return str(torch_dtype).replace("torch.", "")
+
+
+def pipeline_memory_mb(pipe) -> float:
+    """Measured size of a loaded pipeline's weights"""
+    total = 0
+    for name in ("unet", "vae", "text_encoder", "safety_checker"):
+        module = getattr(pipe, name, None)
+        if module is not None and hasattr(module, "parameters"):
+            total += sum(p.numel() * p.element_size() for p in module.parameters())
+    return total / (1024 * 1024)
+
+
+class ModelRegistry:
+    def __init__(self, config_path: str = "models.json"):
+        self.config_path = config_path
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.torch_dtype = torch.float16 if torch.cuda.is_available() else torch.float32
+
+        self.loaded: "OrderedDict[str, Any]" = OrderedDict()  # name -> pipeline, LRU order
+        self.loaded_specs: Dict[str, Dict[str, Any]] = {}  # name -> declaration it was loaded from
+        self.full_vaes: Dict[str, Any] = {}
+        self.sizes_mb: Dict[str, float] = {}
+        self.loading = set()
+        self.errors: Dict[str, str] = {}
+
+        self.reload_config()
+
+    def reload_config(self):
+        """(Re)read model declarations; loaded models whose declaration is unchanged stay loaded"""
+        if os.path.exists(self.config_path):
+            with open(self.config_path) as f:
+                config = json.load(f)
+        else:
+            config = DEFAULT_CONFIG
+
+        self.models: Dict[str, Dict[str, Any]] = config["models"]
+        self.default_model = os.environ.get("DEFAULT_MODEL", config.get("default") or next(iter(self.models)))
+        self.max_loaded = int(os.environ.get("MAX_LOADED_MODELS", config.get("max_loaded", 2)))
+        self.memory_reserve_mb = float(config.get("memory_reserve_mb", 1024))
+
+        for name in list(self.loaded):
+            if self.models.get(name) != self.loaded_specs.get(name):
+                self.evict(name)
+
+    def resolve(self, name: Optional[str] = None) -> str:
+        """Map a requested model name to a declared one, raising KeyError if unknown"""
+        name = name or self.default_model
+        if name not in self.models:
+            raise KeyError(name)
+        return name
+
+    async def get(self, name: str):
+        """
+        Return the loaded pipeline for a model, loading it on demand in the
+        default executor so other requests keep being served meanwhile.
+        Returns None while the model is loading or if loading failed.
+        """
+        if name in self.loaded:
+            if self.loaded_specs.get(name) == self.models[name]:
+                self.loaded.move_to_end(name)
+                return self.loaded[name]
+            # Redeclared while it was loading: swap in the new weights
+            self.evict(name)
+
+        if name in self.loading:
+            return None
+
+        spec = dict(self.models[name])
+        self.loading.add(name)
+        try:
+            self._make_room(name)
+            loop = asyncio.get_running_loop()
+            pipe = await loop.run_in_executor(None, lambda: self._load(name))
+        finally:
+            self.loading.discard(name)
+
+        if pipe is not None:
+            self.loaded[name] = pipe
+            self.loaded_specs[name] = spec
+            self.full_vaes[name] = pipe.vae
+            self.sizes_mb[name] = pipeline_memory_mb(pipe)
+        return pipe
+
+    def presets(self, name: str) -> Dict[str, Dict[str, Any]]:
+        """Per-model overrides of the quality tier presets"""
+        return self.models[name].get("presets", {})
+
+    def evict(self, name: str):
+        """Drop a loaded model and release its memory"""
+        pipe = self.loaded.pop(name, None)
+        self.full_vaes.pop(name, None)
+        if pipe is None:
+            return
+        if self.loaded_specs.pop(name, None) != self.models.get(name):
+            # The measured size belongs to the old weights
+            self.sizes_mb.pop(name, None)
+
+        print(f"♻️ Evicting model: {name}")
+        del pipe
+        gc.collect()
+        if self.device == "cuda":
+            torch.cuda.empty_cache()
+
+    def _make_room(self, name: str):
+        """Evict least recently used models until the new one fits"""
+        needed_mb = self.sizes_mb.get(name, self.models[name].get("approx_memory_mb", 0))
+
+        while self.loaded:
+            too_many = len(self.loaded) >= self.max_loaded
+            too_big = available_memory_mb(self.device) - needed_mb < self.memory_reserve_mb
+            if not (too_many or too_big):
+                break
+            self.evict(next(iter(self.loaded)))
+
+    def snapshot_path(self, name: str) -> str:
+        return os.path.join(SNAPSHOT_DIR, name)
+
+    def snapshot_manifest(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Manifest of a usable snapshot for this model, or None.
+        A snapshot is only usable if it was built from the declared model id
+        and safety checker setting in the dtype this node runs, so no
+        conversion happens at load time.
+        """
+        manifest_path = os.path.join(self.snapshot_path(name), SNAPSHOT_MANIFEST)
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if manifest.get("model_id") != self.models[name]["model_id"]:
+            return None
+        if manifest.get("torch_dtype") != dtype_name(self.torch_dtype):
+            return None
+        # Snapshots without the key predate it; rebuild rather than guess
+        if manifest.get("safety_checker") != self.models[name].get("safety_checker", True):
+            return None
+        return manifest
+
+    def build_snapshot(self, name: str) -> str:
+        """
+        Load a model from the hub, convert it to this registry's dtype and
+        write it as safetensors plus configs for memory-mapped loading.
+        Returns the snapshot directory.
+        """
+        started = time.monotonic()
+        pipe = self._load(name, use_snapshot=False)
+        if pipe is None:
+            raise RuntimeError(f"Could not load {name}: {self.errors.get(name)}")
+
+        path = self.snapshot_path(name)
+        os.makedirs(path, exist_ok=True)
+        pipe.save_pretrained(path, safe_serialization=True)
+
+        manifest = {
+            "model": name,
+            "model_id": self.models[name]["model_id"],
+            "torch_dtype": dtype_name(self.torch_dtype),
+            "safety_checker": self.models[name].get("safety_checker", True),
+            "size_mb": round(pipeline_memory_mb(pipe), 1),
+            "built_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "build_seconds": round(time.monotonic() - started, 1)
+        }
+        with open(os.path.join(path, SNAPSHOT_MANIFEST), "w") as f:
+            json.dump(manifest, f, indent=2)
+
+        return path
+
+    def _load(self, name: str, use_snapshot: bool = True):
+        """Load a declared model with proper error handling, preferring its snapshot"""
+        from diffusers import StableDiffusionPipeline
+
+        spec = self.models[name]
+        source = spec["model_id"]
+        kwargs = {
+            "torch_dtype": self.torch_dtype,
+            "cache_dir": CACHE_DIR,
+            "local_files_only": False
+        }
+        if not spec.get("safety_checker", True):
+            kwargs.update(safety_checker=None, requires_safety_checker=False)
+
+        if use_snapshot and self.snapshot_manifest(name):
+            # Weights are already in the target dtype; safetensors are
+            # memory-mapped into empty modules instead of being converted
+            source = self.snapshot_path(name)
+            kwargs.update(local_files_only=True, low_cpu_mem_usage=True)
+            print(f"⚡ Loading model {name} from snapshot: {source}")
+        else:
+            print(f"🚀 Loading model {name}: {source}")
+        print(f"📱 Device: {self.device}, dtype: {self.torch_dtype}")
+
+        try:
+            started = time.monotonic()
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            pipe = StableDiffusionPipeline.from_pretrained(source, **kwargs)
+            pipe = pipe.to(self.device)
+            self.errors.pop(name, None)
+            print(f"✅ Model {name} loaded successfully on {self.device} in {time.monotonic() - started:.1f}s")
+            return pipe
+
+        except Exception as e:
+            print(f"❌ Failed to load model {name}: {e}")
+            self.errors[name] = str(e)
+            return None
+
+    def status(self) -> Dict[str, Any]:
+        """Registry state for health and model listing endpoints"""
+        return {
+            "default": self.default_model,
+            "declared": list(self.models),
+            "loaded": list(self.loaded),
+            "loading": sorted(self.loading),
+            "errors": self.errors,
+            "max_loaded": self.max_loaded,
+            "loaded_memory_mb": {name: round(self.sizes_mb[name], 1) for name in self.loaded},
+            "snapshots": [name for name in self.models if self.snapshot_manifest(name)],
+            "available_memory_mb": round(available_memory_mb(self.device), 1)
+        }